@@ -29,8 +29,11 @@ def get_current_user(
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
+    # get_db routed `db` to this user's shard from the same bearer token.
     user = db.query(User).filter(User.id == int(user_id)).first()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    # Attributes audit events written through this session to the caller.
+    db.info["actor_id"] = user.id
     return user
@@ -0,0 +1,221 @@
+"""Admission control: per-route-class concurrency limits and per-user rate limits.
+
+Every request is assigned a route class. Each class admits a fixed number
+of concurrent requests and lets a bounded number wait behind them; when
+the wait queue is full, or a request has waited longer than the class's
+timeout, it is shed immediately with 503 and Retry-After instead of piling
+onto the shared threadpool. Independently, each user (or client IP when
+unauthenticated) draws from a token bucket and gets 429 when it is empty.
+Cheap endpoints such as /health bypass both; they are async so they never
+wait for a worker thread either.
+
+Sync endpoints run on anyio's worker threads, so at startup the thread
+limiter is raised to `threadpool_size()`: every admitted request can hold
+a thread, with headroom for exempt paths and file responses.
+"""
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.security import decode_token
+
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+# (route class, HTTP method or None for any, path prefixes); first match wins.
+ROUTE_CLASSES = [
+    ("auth", "POST", ("/api/auth/login", "/api/auth/register", "/api/auth/refresh")),
+    ("report", "GET", ("/api/reports",)),
+    ("aggregate", None, ("/api/dashboard", "/api/portfolio", "/api/bootstrap", "/api/lots/gains")),
+    ("listing", "GET", ("/api/transactions", "/api/lots")),
+]
+
+# route class -> (max concurrent, max queued, seconds a request may wait)
+CLASS_LIMITS = {
+    "auth": (4, 16, 2.0),
+    "report": (4, 8, 10.0),
+    "aggregate": (8, 32, 2.0),
+    "listing": (4, 16, 2.0),
+    "default": (32, 128, 5.0),
+}
+THREADPOOL_HEADROOM = 8
+
+
+def threadpool_size() -> int:
+    """Worker threads needed so admitted requests never queue for a thread."""
+    return sum(limit[0] for limit in CLASS_LIMITS.values()) + THREADPOOL_HEADROOM
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Route class for a request, or None if it bypasses admission control."""
+    if method == "OPTIONS" or path in EXEMPT_PATHS:
+        return None
+    for name, class_method, prefixes in ROUTE_CLASSES:
+        if (class_method is None or class_method == method) and path.startswith(prefixes):
+            return name
+    return "default"
+
+
+@dataclass
+class ClassLimiter:
+    """Concurrency slots plus a bounded wait queue for one route class."""
+
+    name: str
+    max_concurrent: int
+    max_queue: int
+    queue_timeout: float
+    active: int = 0
+    queued: int = 0
+    admitted_total: int = 0
+    shed_total: int = 0
+    timeout_total: int = 0
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def acquire(self) -> bool:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+        else:
+            if self.queued >= self.max_queue:
+                self.shed_total += 1
+                return False
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.timeout_total += 1
+                return False
+            finally:
+                self.queued -= 1
+        self.active += 1
+        self.admitted_total += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self.semaphore.release()
+
+
+class TokenBuckets:
+    """Per-key token buckets refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, burst: int, idle_ttl: float = 600.0):
+        self.rate = rate
+        self.burst = burst
+        self.idle_ttl = idle_ttl
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._calls = 0
+        self.limited_total = 0
+
+    def take(self, key: str) -> float:
+        """Consume one token; returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        self._calls += 1
+        if self._calls % 1000 == 0:
+            self._prune(now)
+        if tokens < 1.0:
+            self._buckets[key] = (tokens, now)
+            self.limited_total += 1
+            return (1.0 - tokens) / self.rate
+        self._buckets[key] = (tokens - 1.0, now)
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated > self.idle_ttl]
+        for key in stale:
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def _client_key(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            payload = decode_token(token) if scheme.lower() == "bearer" else None
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying rate limits and route-class admission."""
+
+    def __init__(self, app):
+        settings = get_settings()
+        self.app = app
+        self.limiters = {name: ClassLimiter(name, *limits) for name, limits in CLASS_LIMITS.items()}
+        self.buckets = TokenBuckets(settings.RATE_LIMIT_PER_MINUTE / 60.0, settings.RATE_LIMIT_BURST)
+        self.enabled = settings.ADMISSION_CONTROL_ENABLED
+        global _middleware
+        _middleware = self
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+        name = route_class(scope["method"], scope["path"])
+        if name is None:
+            return await self.app(scope, receive, send)
+
+        wait = self.buckets.take(_client_key(scope))
+        if wait > 0:
+            return await _reject(send, 429, "Rate limit exceeded", wait)
+
+        limiter = self.limiters[name]
+        if not await limiter.acquire():
+            return await _reject(send, 503, "Server busy, retry shortly", 1)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+_middleware: Optional[AdmissionControlMiddleware] = None
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of queue depth, concurrency and shed counts."""
+    if _middleware is None:
+        return ""
+    lines = []
+    gauges = [("admission_active", "active", "gauge"), ("admission_queue_depth", "queued", "gauge"),
+              ("admission_admitted_total", "admitted_total", "counter"),
+              ("admission_shed_total", "shed_total", "counter"),
+              ("admission_queue_timeout_total", "timeout_total", "counter")]
+    for metric, attr, kind in gauges:
+        lines.append(f"# TYPE {metric} {kind}")
+        for limiter in _middleware.limiters.values():
+            lines.append(f'{metric}{{route_class="{limiter.name}"}} {getattr(limiter, attr)}')
+    lines.append("# TYPE admission_rate_limited_total counter")
+    lines.append(f"admission_rate_limited_total {_middleware.buckets.limited_total}")
+    lines.append("# TYPE admission_rate_limit_buckets gauge")
+    lines.append(f"admission_rate_limit_buckets {len(_middleware.buckets)}")
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,7 @@
 """Application configuration using environment variables."""
 
+import os
+
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -12,6 +14,23 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     CORS_ORIGINS: str = "http://localhost:5173,http://127.0.0.1:5173"
+    PRICE_STORE_DIR: str = "data/prices"
+    TRANSACTION_ARCHIVE_DIR: str = "data/transactions_archive"
+    TRANSACTION_HOT_MONTHS: int = 24
+    ADMISSION_CONTROL_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 120
+    RATE_LIMIT_BURST: int = 60
+    FX_FIXTURE_PATH: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fixtures", "fx_rates.json")
+    FX_SNAPSHOT_TTL_SECONDS: int = 60
+    REPORT_CACHE_DIR: str = "data/reports"
+    REPORT_WORKERS: int = 2
+    EVENT_LOG_DIR: str = "data/events"
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_RETENTION_HOURS: int = 24
+    SHARD_MAP_PATH: str = ""
+    SHARD_MAP_RELOAD_SECONDS: float = 5.0
 
     model_config = {
         "env_file": ".env",
@@ -0,0 +1,213 @@
+"""Route each user's data to one of several databases.
+
+Users are hashed into a fixed number of buckets (user_id % buckets) and
+the shard map assigns every bucket to a shard. Moving users between
+shards therefore means reassigning buckets, which `shard_admin.py` does
+without touching the rest of the map. A JSON shard map looks like:
+
+    {
+      "buckets": 64,
+      "shards": {"shard0": "postgresql://.../wealth_0", "shard1": "postgresql://.../wealth_1"},
+      "assignments": {"shard0": "0-31", "shard1": "32-63"},
+      "frozen": []
+    }
+
+Buckets listed in "frozen" are mid-move: requests for their users get 503
+until the move finishes. Without SHARD_MAP_PATH there is a single shard,
+"default", on DATABASE_URL. Running processes re-read the map when the
+file changes, checking at most every SHARD_MAP_RELOAD_SECONDS.
+
+User ids are allocated by the directory database (DATABASE_URL), which
+also maps emails to ids for login, so ids are unique across shards. Row
+ids in other tables are per shard.
+
+For a local two-shard setup on SQLite:
+
+    mkdir -p data/shards
+    DATABASE_URL=sqlite:///data/directory.db SHARD_MAP_PATH=shards.example.json uvicorn app.main:app
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+DEFAULT_SHARD = "default"
+
+
+def parse_buckets(spec: str) -> list[int]:
+    """'0-3,8' -> [0, 1, 2, 3, 8]"""
+    buckets = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        buckets.extend(range(int(lo), int(hi or lo) + 1))
+    return buckets
+
+
+def format_buckets(buckets) -> str:
+    """[0, 1, 2, 3, 8] -> '0-3,8'"""
+    parts, run = [], []
+    for bucket in sorted(buckets):
+        if run and bucket != run[-1] + 1:
+            parts.append(f"{run[0]}-{run[-1]}" if len(run) > 1 else str(run[0]))
+            run = []
+        run.append(bucket)
+    if run:
+        parts.append(f"{run[0]}-{run[-1]}" if len(run) > 1 else str(run[0]))
+    return ",".join(parts)
+
+
+@dataclass
+class ShardMap:
+    """Bucket -> shard assignment plus each shard's database URL."""
+
+    shards: dict[str, str]
+    bucket_shards: list[str]
+    frozen: set[int] = field(default_factory=set)
+
+    @property
+    def buckets(self) -> int:
+        return len(self.bucket_shards)
+
+    @classmethod
+    def single(cls, url: str) -> "ShardMap":
+        return cls({DEFAULT_SHARD: url}, [DEFAULT_SHARD])
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ShardMap":
+        bucket_shards: list[Optional[str]] = [None] * int(data["buckets"])
+        for shard, spec in data["assignments"].items():
+            if shard not in data["shards"]:
+                raise ValueError(f"Buckets assigned to unknown shard {shard}")
+            for bucket in parse_buckets(spec):
+                if bucket_shards[bucket] is not None:
+                    raise ValueError(f"Bucket {bucket} assigned twice")
+                bucket_shards[bucket] = shard
+        missing = [i for i, shard in enumerate(bucket_shards) if shard is None]
+        if missing:
+            raise ValueError(f"Unassigned buckets: {format_buckets(missing)}")
+        return cls(dict(data["shards"]), bucket_shards, set(data.get("frozen", ())))
+
+    @classmethod
+    def load(cls, path: str) -> "ShardMap":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": self.buckets,
+            "shards": self.shards,
+            "assignments": {shard: format_buckets(self.buckets_of(shard)) for shard in self.shards},
+            "frozen": sorted(self.frozen),
+        }
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+        os.replace(tmp, path)
+
+    def bucket_of(self, user_id: int) -> int:
+        return user_id % self.buckets
+
+    def shard_for(self, user_id: int) -> str:
+        return self.bucket_shards[self.bucket_of(user_id)]
+
+    def buckets_of(self, shard: str) -> list[int]:
+        return [i for i, name in enumerate(self.bucket_shards) if name == shard]
+
+    def is_frozen(self, user_id: int) -> bool:
+        return self.bucket_of(user_id) in self.frozen
+
+
+class ShardFrozen(Exception):
+    """The user's bucket is being moved between shards."""
+
+
+class ShardRouter:
+    """Engines and sessions per shard, resolved from a (reloadable) shard map."""
+
+    def __init__(self, directory_engine: Engine, map_path: Optional[str] = None, reload_seconds: float = 5.0):
+        self.directory_engine = directory_engine
+        self.map_path = map_path or None
+        self.reload_seconds = reload_seconds
+        self._engines: dict[str, Engine] = {}
+        self._sessionmakers: dict[str, sessionmaker] = {}
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._map = self._read_map()
+
+    def _read_map(self) -> ShardMap:
+        if not self.map_path:
+            return ShardMap.single(self.directory_engine.url.render_as_string(hide_password=False))
+        self._mtime = os.path.getmtime(self.map_path)
+        return ShardMap.load(self.map_path)
+
+    @property
+    def map(self) -> ShardMap:
+        if self.map_path and time.monotonic() - self._checked >= self.reload_seconds:
+            self._checked = time.monotonic()
+            if os.path.getmtime(self.map_path) != self._mtime:
+                with self._lock:
+                    self._map = self._read_map()
+        return self._map
+
+    def reload(self) -> ShardMap:
+        with self._lock:
+            self._map = self._read_map()
+        return self._map
+
+    def names(self) -> list[str]:
+        return list(self.map.shards)
+
+    def engine(self, shard: str) -> Engine:
+        shards = self.map.shards
+        with self._lock:
+            if shard not in self._engines:
+                if shard not in shards:
+                    raise KeyError(f"Unknown shard {shard}")
+                url = shards[shard]
+                if url == self.directory_engine.url.render_as_string(hide_password=False):
+                    self._engines[shard] = self.directory_engine
+                else:
+                    self._engines[shard] = create_engine(url, pool_pre_ping=True, echo=False)
+                self._sessionmakers[shard] = sessionmaker(autocommit=False, autoflush=False,
+                                                          bind=self._engines[shard])
+            return self._engines[shard]
+
+    def engines(self) -> dict[str, Engine]:
+        return {name: self.engine(name) for name in self.names()}
+
+    def session(self, shard: str) -> Session:
+        self.engine(shard)
+        db = self._sessionmakers[shard]()
+        db.info["shard"] = shard
+        return db
+
+    def shard_for(self, user_id: int) -> str:
+        shard_map = self.map
+        if shard_map.is_frozen(user_id):
+            raise ShardFrozen(f"User {user_id} is being moved between shards")
+        return shard_map.shard_for(user_id)
+
+    def session_for(self, user_id: int) -> Session:
+        return self.session(self.shard_for(user_id))
+
+    def dispose(self) -> None:
+        with self._lock:
+            for engine in self._engines.values():
+                if engine is not self.directory_engine:
+                    engine.dispose()
+            self._engines.clear()
+            self._sessionmakers.clear()
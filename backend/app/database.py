@@ -1,12 +1,16 @@
 """Database connection and session management."""
 
+from fastapi import HTTPException, Request, status
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import get_settings
+from app.core.security import decode_token
+from app.core.sharding import ShardFrozen, ShardRouter
 
 settings = get_settings()
+# DATABASE_URL holds the user directory, and all user data too unless a shard map is configured.
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -15,10 +19,47 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+# Tables that live only in the directory database, never on shards.
+DirectoryBase = declarative_base()
 
+shard_router = ShardRouter(engine, settings.SHARD_MAP_PATH, settings.SHARD_MAP_RELOAD_SECONDS)
 
-def get_db():
-    """Dependency for database session."""
+
+def _token_user_id(request: Request):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    payload = decode_token(token) if scheme.lower() == "bearer" else None
+    try:
+        return int(payload["sub"]) if payload and payload.get("type") == "access" else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def shard_session_for(user_id: int):
+    """Session on the user's shard, or 503 while their bucket is being moved."""
+    try:
+        return shard_router.session_for(user_id)
+    except ShardFrozen as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc),
+                            headers={"Retry-After": "5"})
+
+
+def get_db(request: Request):
+    """Dependency for database session.
+
+    Authenticated requests get a session on the caller's shard; anything
+    else gets the directory database. `get_current_user` re-validates the
+    token against this same session.
+    """
+    user_id = _token_user_id(request)
+    db = shard_session_for(user_id) if user_id is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_directory_db():
+    """Dependency for a session on the directory database."""
     db = SessionLocal()
     try:
         yield db
@@ -3,24 +3,45 @@
 import traceback
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import get_settings
-from app.database import engine, Base
+from app.core.admission import AdmissionControlMiddleware, render_metrics, threadpool_size
+from app.database import engine, Base, DirectoryBase, shard_router
+from app.services.outbox import start_dispatcher, stop_dispatcher
+from app.services.fx import seed_fx_rates
+from app.services.reports import shutdown_report_pool
+from app.services.schema_upgrades import upgrade_schema
+from app.services.user_directory import sync_directory
 
 # Import models so they register with Base.metadata before create_all
-from app.models import User, Goal, Investment, Transaction  # noqa: F401
+from app.models import User, Goal, Investment, Transaction, TaxLot, LotDisposal, GoalEarmark, FxRate, OutboxEvent, UserDirectory  # noqa: F401
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create tables on startup."""
-    Base.metadata.create_all(bind=engine)
+    """Create tables on the directory and every shard and start the outbox dispatchers;
+    stop background workers on shutdown."""
+    DirectoryBase.metadata.create_all(bind=engine)
+    shard_engines = shard_router.engines()
+    for shard_engine in shard_engines.values():
+        upgrade_schema(shard_engine)
+        Base.metadata.create_all(bind=shard_engine)
+        seed_fx_rates(shard_engine)
+    sync_directory(engine, shard_engines)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, threadpool_size())
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        start_dispatcher()
     yield
+    stop_dispatcher()
+    shutdown_report_pool()
+    shard_router.dispose()
 
 
 app = FastAPI(
@@ -30,6 +51,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Added before CORS so shed responses still carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[origin.strip() for origin in settings.CORS_ORIGINS.split(",")],
@@ -50,13 +73,19 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Admission control metrics in Prometheus text format."""
+    return render_metrics()
+
+
 # Routers
-from app.routers import auth, goals, portfolio, dashboard, profile, investments, transactions
+from app.routers import auth, goals, portfolio, dashboard, profile, investments, transactions, lots, bootstrap, reports
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(profile.router, prefix="/api/profile", tags=["Profile"])
@@ -65,3 +94,6 @@ app.include_router(investments.router, prefix="/api/investments", tags=["Investm
 app.include_router(portfolio.router, prefix="/api/portfolio", tags=["Portfolio"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["Transactions"])
+app.include_router(lots.router, prefix="/api/lots", tags=["Tax Lots"])
+app.include_router(bootstrap.router, prefix="/api/bootstrap", tags=["Bootstrap"])
+app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
@@ -4,5 +4,10 @@ from app.models.user import User
 from app.models.goal import Goal
 from app.models.investment import Investment
 from app.models.transaction import Transaction
+from app.models.tax_lot import TaxLot, LotDisposal
+from app.models.goal_earmark import GoalEarmark
+from app.models.fx_rate import FxRate
+from app.models.outbox import OutboxEvent
+from app.models.user_directory import UserDirectory
 
-__all__ = ["User", "Goal", "Investment", "Transaction"]
+__all__ = ["User", "Goal", "Investment", "Transaction", "TaxLot", "LotDisposal", "GoalEarmark", "FxRate", "OutboxEvent", "UserDirectory"]
@@ -0,0 +1,17 @@
+"""FX rate model."""
+
+from datetime import datetime
+from sqlalchemy import Column, String, Numeric, Date, DateTime
+
+from app.database import Base
+
+
+class FxRate(Base):
+    """Latest USD value of one unit of a currency."""
+
+    __tablename__ = "fx_rates"
+
+    currency = Column(String(3), primary_key=True)
+    usd_rate = Column(Numeric(18, 8), nullable=False)
+    as_of = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -19,6 +19,15 @@ class Goal(Base):
     target_date = Column(Date, nullable=False)
     monthly_contribution = Column(Numeric(15, 2), default=0)
     status = Column(String(50), default="active")
+    # Maintained incrementally from earmarked holdings; see app.models.goal_earmark.
+    funded_amount = Column(Numeric(15, 2), nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="goals")
+    earmarks = relationship("GoalEarmark", back_populates="goal", cascade="all, delete-orphan")
+
+    @property
+    def progress_percentage(self) -> float:
+        if not self.target_amount or self.target_amount <= 0:
+            return 0.0
+        return round(min(float((self.funded_amount or 0) / self.target_amount * 100), 100.0), 2)
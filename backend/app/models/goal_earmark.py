@@ -0,0 +1,23 @@
+"""Goal earmark model."""
+
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+
+class GoalEarmark(Base):
+    """Share of a holding set aside for a goal."""
+
+    __tablename__ = "goal_earmarks"
+    __table_args__ = (UniqueConstraint("goal_id", "investment_id", name="uq_goal_earmarks_goal_investment"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    goal_id = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"), nullable=False, index=True)
+    investment_id = Column(Integer, ForeignKey("investments.id", ondelete="CASCADE"), nullable=False, index=True)
+    percentage = Column(Numeric(5, 2), nullable=False, default=100)
+
+    goal = relationship("Goal", back_populates="earmarks")
+    investment = relationship("Investment")
+
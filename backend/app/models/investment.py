@@ -22,5 +22,6 @@ class Investment(Base):
     current_value = Column(Numeric(15, 2), nullable=False)
     last_price = Column(Numeric(15, 4), nullable=True)
     last_price_at = Column(DateTime, nullable=True)
+    currency = Column(String(3), nullable=False, default="USD")
 
     user = relationship("User", back_populates="investments")
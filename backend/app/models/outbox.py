@@ -0,0 +1,132 @@
+"""Transactional outbox for the audit/event log."""
+
+import json
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import JSON, Column, DateTime, Integer, String, event, insert, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.database import Base
+from app.models.goal import Goal
+from app.models.goal_earmark import GoalEarmark
+from app.models.investment import Investment
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+class OutboxEvent(Base):
+    """One audited change, pending or already dispatched to the event log."""
+
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    actor_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    action = Column(String(20), nullable=False)
+    changes = Column(JSON, nullable=False, default=dict)
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    dispatched_at = Column(DateTime, nullable=True, index=True)
+
+
+# Per shard: set after a commit that wrote outbox rows there, so that shard's dispatcher can wake early.
+_pending: dict[str, threading.Event] = {}
+_pending_lock = threading.Lock()
+
+AUDITED = {User: "user", Goal: "goal", Investment: "investment", Transaction: "transaction", GoalEarmark: "goal_earmark"}
+REDACTED = {"password"}
+
+
+def outbox_pending(shard: str) -> threading.Event:
+    """The event that wakes `shard`'s dispatcher."""
+    with _pending_lock:
+        if shard not in _pending:
+            _pending[shard] = threading.Event()
+        return _pending[shard]
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.loads(json.dumps(value, default=str))
+
+
+def _snapshot(obj) -> dict:
+    # Read loaded state only; lazy-loading a just-deleted row mid-flush would fail.
+    state = inspect(obj)
+    return {attr.key: "***" if attr.key in REDACTED else _plain(state.dict.get(attr.key))
+            for attr in state.mapper.column_attrs}
+
+
+def _diff(obj) -> dict:
+    changes = {}
+    for attr in inspect(obj).mapper.column_attrs:
+        history = get_history(obj, attr.key)
+        if not history.has_changes():
+            continue
+        if attr.key in REDACTED:
+            changes[attr.key] = "***"
+            continue
+        old = (history.deleted or [None])[0]
+        new = (history.added or [None])[0]
+        changes[attr.key] = [_plain(old), _plain(new)]
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _record_outbox_events(session: Session, flush_context) -> None:
+    """Insert one outbox row per audited change, inside the flush's transaction.
+
+    The rows commit or roll back together with the mutation itself and cost
+    one extra batched INSERT per flush; everything slower (serialising to
+    the event log, fan-out to subscribers) happens later in the dispatcher.
+    Changes made with bulk `query.update()`/`delete()` are not captured.
+    """
+    actor_id = session.info.get("actor_id")
+    rows = []
+    for action, objects in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            entity = AUDITED.get(type(obj))
+            if entity is None:
+                continue
+            if action == "updated":
+                changes = _diff(obj)
+                if not changes:
+                    continue
+            else:
+                changes = _snapshot(obj)
+            user_id = obj.id if isinstance(obj, User) else getattr(obj, "user_id", None)
+            rows.append({"actor_id": actor_id if actor_id is not None else user_id, "user_id": user_id,
+                         "entity": entity, "entity_id": obj.id, "action": action, "changes": changes,
+                         "occurred_at": datetime.utcnow()})
+    if rows:
+        session.connection().execute(insert(OutboxEvent.__table__), rows)
+        session.info["outbox_pending"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    if not session.info.pop("outbox_pending", False):
+        return
+    shard = session.info.get("shard")
+    if shard is not None:
+        outbox_pending(shard).set()
+        return
+    # Not opened through the shard router; its engine may back any shard.
+    with _pending_lock:
+        pending = list(_pending.values())
+    for shard_pending in pending:
+        shard_pending.set()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_pending(session: Session) -> None:
+    session.info.pop("outbox_pending", None)
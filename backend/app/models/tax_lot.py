@@ -0,0 +1,50 @@
+"""Tax lot models."""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+
+class TaxLot(Base):
+    """Units acquired in a single buy, tracked until fully disposed."""
+
+    __tablename__ = "tax_lots"
+    __table_args__ = (Index("ix_tax_lots_user_symbol", "user_id", "symbol"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Plain column: a partitioned transactions table cannot be referenced by id alone.
+    transaction_id = Column(Integer, nullable=True, index=True)
+    symbol = Column(String(50), nullable=False)
+    quantity = Column(Numeric(15, 6), nullable=False)
+    remaining_quantity = Column(Numeric(15, 6), nullable=False)
+    unit_cost = Column(Numeric(15, 4), nullable=False)
+    currency = Column(String(3), nullable=False, default="USD")
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    closed_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", back_populates="tax_lots")
+    disposals = relationship("LotDisposal", back_populates="lot")
+
+
+class LotDisposal(Base):
+    """Portion of a lot consumed by a sell; one row per (sell, lot) pair."""
+
+    __tablename__ = "lot_disposals"
+    __table_args__ = (Index("ix_lot_disposals_user_disposed", "user_id", "disposed_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    lot_id = Column(Integer, ForeignKey("tax_lots.id", ondelete="SET NULL"), nullable=True)
+    transaction_id = Column(Integer, nullable=True, index=True)
+    symbol = Column(String(50), nullable=False)
+    quantity = Column(Numeric(15, 6), nullable=False)
+    unit_cost = Column(Numeric(15, 4), nullable=False)
+    unit_proceeds = Column(Numeric(15, 4), nullable=False)
+    currency = Column(String(3), nullable=False, default="USD")
+    acquired_at = Column(DateTime, nullable=True)
+    disposed_at = Column(DateTime, default=datetime.utcnow)
+
+    lot = relationship("TaxLot", back_populates="disposals")
@@ -19,6 +19,7 @@ class Transaction(Base):
     quantity = Column(Numeric(15, 6), nullable=False)
     price = Column(Numeric(15, 4), nullable=False)
     fees = Column(Numeric(15, 2), default=0)
+    currency = Column(String(3), nullable=False, default="USD")
     executed_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="transactions")
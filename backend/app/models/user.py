@@ -18,8 +18,12 @@ class User(Base):
     password = Column(String(255), nullable=False)
     risk_profile = Column(String(50), default="moderate")
     kyc_status = Column(String(50), default="unverified")
+    base_currency = Column(String(3), nullable=False, default="USD")
+    # Bumped by every change to the user's data; see app.services.user_versions.
+    data_version = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     goals = relationship("Goal", back_populates="user")
     investments = relationship("Investment", back_populates="user")
     transactions = relationship("Transaction", back_populates="user")
+    tax_lots = relationship("TaxLot", back_populates="user")
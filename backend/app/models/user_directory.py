@@ -0,0 +1,16 @@
+"""User directory model."""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.database import DirectoryBase
+
+
+class UserDirectory(DirectoryBase):
+    """Global user id allocation and email lookup; lives only in the directory database."""
+
+    __tablename__ = "user_directory"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=True)
+    email = Column(String(255), unique=True, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -3,30 +3,57 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_directory_db, shard_session_for
 from app.models.user import User
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse, RefreshRequest, ForgotPasswordRequest
 from app.schemas.user import UserResponse
 from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token, decode_token
+from app.services.fx import UnknownCurrency, check_currency
+from app.services.user_directory import allocate_user_id, lookup_user_id, release_user_id
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse)
-def register(data: RegisterRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(name=data.name, email=data.email, password=get_password_hash(data.password), risk_profile=data.risk_profile)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+def register(data: RegisterRequest, directory: Session = Depends(get_directory_db)):
+    try:
+        user_id = allocate_user_id(directory, data.email)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    # The directory entry is only kept once the user row exists on its shard.
+    db = None
+    try:
+        db = shard_session_for(user_id)
+        base_currency = check_currency(db, data.base_currency)
+        user = User(id=user_id, name=data.name, email=data.email, password=get_password_hash(data.password),
+                    risk_profile=data.risk_profile, base_currency=base_currency)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    except UnknownCurrency as exc:
+        release_user_id(directory, user_id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except Exception:
+        release_user_id(directory, user_id)
+        raise
+    finally:
+        if db is not None:
+            db.close()
+
+
+def _shard_user(user_id: int):
+    db = shard_session_for(user_id)
+    try:
+        return db.query(User).filter(User.id == user_id).first()
+    finally:
+        db.close()
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+def login(data: LoginRequest, directory: Session = Depends(get_directory_db)):
+    user_id = lookup_user_id(directory, data.email)
+    user = _shard_user(user_id) if user_id is not None else None
     if not user or not verify_password(data.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -35,12 +62,12 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh(data: RefreshRequest, db: Session = Depends(get_db)):
+def refresh(data: RefreshRequest):
     payload = decode_token(data.refresh_token)
     if payload is None or payload.get("type") != "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = _shard_user(int(user_id))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -0,0 +1,23 @@
+"""Bootstrap router: several page resources in one round trip."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.bootstrap import BootstrapResponse
+from app.services.bootstrap import RESOURCES, resolve
+from app.auth.dependencies import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=BootstrapResponse, response_model_exclude_unset=True)
+def bootstrap(resources: str = Query(..., description=f"Comma-separated keys: {', '.join(RESOURCES)}"),
+              transaction_limit: int | None = Query(None, ge=1), db: Session = Depends(get_db),
+              current_user: User = Depends(get_current_user)):
+    keys = [key.strip() for key in resources.split(",") if key.strip()]
+    try:
+        return resolve(db, current_user, keys, transaction_limit)
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown resources: {exc.args[0]}")
@@ -6,7 +6,10 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.goal import Goal
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
+from app.models.goal_earmark import GoalEarmark
+from app.models.investment import Investment
+from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse, EarmarkCreate, EarmarkResponse
+from app.services.goal_funding import earmarked_percentage
 from app.auth.dependencies import get_current_user
 
 router = APIRouter()
@@ -55,3 +58,52 @@ def delete_goal(goal_id: int, db: Session = Depends(get_db), current_user: User
     db.delete(goal)
     db.commit()
     return None
+
+
+def _earmark_response(earmark: GoalEarmark, investment: Investment) -> EarmarkResponse:
+    return EarmarkResponse(id=earmark.id, goal_id=earmark.goal_id, investment_id=earmark.investment_id,
+                           symbol=investment.symbol, percentage=earmark.percentage,
+                           earmarked_value=(investment.current_value or 0) * earmark.percentage / 100)
+
+
+@router.get("/{goal_id}/earmarks", response_model=list[EarmarkResponse])
+def list_earmarks(goal_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
+    if not goal:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
+    rows = db.query(GoalEarmark, Investment).join(Investment, Investment.id == GoalEarmark.investment_id).filter(
+        GoalEarmark.goal_id == goal_id).all()
+    return [_earmark_response(earmark, investment) for earmark, investment in rows]
+
+
+@router.put("/{goal_id}/earmarks", response_model=EarmarkResponse)
+def set_earmark(goal_id: int, data: EarmarkCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
+    if not goal:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
+    investment = db.query(Investment).filter(Investment.id == data.investment_id, Investment.user_id == current_user.id).first()
+    if not investment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Investment not found")
+    if earmarked_percentage(db, investment.id, exclude_goal_id=goal_id) + data.percentage > 100:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Holding would be earmarked beyond 100%")
+
+    earmark = db.query(GoalEarmark).filter(GoalEarmark.goal_id == goal_id, GoalEarmark.investment_id == investment.id).first()
+    if earmark:
+        earmark.percentage = data.percentage
+    else:
+        earmark = GoalEarmark(user_id=current_user.id, goal_id=goal_id, investment_id=investment.id, percentage=data.percentage)
+        db.add(earmark)
+    db.commit()
+    db.refresh(earmark)
+    return _earmark_response(earmark, investment)
+
+
+@router.delete("/{goal_id}/earmarks/{investment_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_earmark(goal_id: int, investment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    earmark = db.query(GoalEarmark).filter(GoalEarmark.goal_id == goal_id, GoalEarmark.investment_id == investment_id,
+                                           GoalEarmark.user_id == current_user.id).first()
+    if not earmark:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Earmark not found")
+    db.delete(earmark)
+    db.commit()
+    return None
@@ -7,6 +7,8 @@ from app.models.user import User
 from app.models.investment import Investment
 from app.schemas.investment import InvestmentCreate, InvestmentUpdate, InvestmentResponse
 from app.auth.dependencies import get_current_user
+from app.services.fx import UnknownCurrency, check_currency
+from app.services.tax_lots import open_lot, reset_open_lots
 
 router = APIRouter()
 
@@ -17,7 +19,15 @@ def list_investments(db: Session = Depends(get_db), current_user: User = Depends
 @router.post("", response_model=InvestmentResponse, status_code=status.HTTP_201_CREATED)
 def create_investment(data: InvestmentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     cost_basis = data.units * data.avg_buy_price
+    try:
+        currency = check_currency(db, data.currency)
+    except UnknownCurrency as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     existing = db.query(Investment).filter(Investment.user_id == current_user.id, Investment.symbol == data.symbol).first()
+    if existing and existing.currency != currency:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"{data.symbol} is held in {existing.currency}, not {currency}")
+    open_lot(db, current_user.id, data.symbol, data.units, data.avg_buy_price, currency=currency)
     if existing:
         total_units = existing.units + data.units
         total_cost = existing.cost_basis + cost_basis
@@ -38,6 +48,7 @@ def create_investment(data: InvestmentCreate, db: Session = Depends(get_db), cur
         avg_buy_price=data.avg_buy_price,
         cost_basis=cost_basis,
         current_value=cost_basis,
+        currency=currency,
         last_price=data.avg_buy_price
     )
     db.add(investment)
@@ -54,6 +65,9 @@ def update_investment(investment_id: int, data: InvestmentUpdate, db: Session =
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(investment, field, value)
+    if "units" in update_data or "avg_buy_price" in update_data:
+        reset_open_lots(db, current_user.id, investment.symbol, investment.units, investment.avg_buy_price,
+                        currency=investment.currency)
         
     db.commit()
     db.refresh(investment)
@@ -64,7 +78,8 @@ def delete_investment(investment_id: int, db: Session = Depends(get_db), current
     investment = db.query(Investment).filter(Investment.id == investment_id, Investment.user_id == current_user.id).first()
     if not investment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Investment not found")
-        
+
+    reset_open_lots(db, current_user.id, investment.symbol, 0, investment.avg_buy_price)
     db.delete(investment)
     db.commit()
     return None
@@ -0,0 +1,30 @@
+"""Tax lots router."""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.models.tax_lot import TaxLot
+from app.schemas.tax_lot import TaxLotResponse, GainsReport
+from app.services.tax_lots import compute_gains
+from app.auth.dependencies import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[TaxLotResponse])
+def list_lots(symbol: str | None = None, include_closed: bool = False, db: Session = Depends(get_db),
+              current_user: User = Depends(get_current_user)):
+    query = db.query(TaxLot).filter(TaxLot.user_id == current_user.id)
+    if symbol:
+        query = query.filter(TaxLot.symbol == symbol)
+    if not include_closed:
+        query = query.filter(TaxLot.remaining_quantity > 0)
+    return query.order_by(TaxLot.symbol, TaxLot.acquired_at, TaxLot.id).all()
+
+
+@router.get("/gains", response_model=GainsReport)
+def get_gains(tax_year: int | None = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return compute_gains(db, current_user.id, tax_year or datetime.utcnow().year, current_user.base_currency or "USD")
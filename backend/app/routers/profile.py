@@ -1,12 +1,13 @@
 """Profile router."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 from app.auth.dependencies import get_current_user
+from app.services.fx import UnknownCurrency, check_currency
 
 router = APIRouter()
 
@@ -22,6 +23,11 @@ def update_profile(data: UserUpdate, db: Session = Depends(get_db), current_user
         current_user.name = data.name
     if data.risk_profile is not None:
         current_user.risk_profile = data.risk_profile
+    if data.base_currency is not None:
+        try:
+            current_user.base_currency = check_currency(db, data.base_currency)
+        except UnknownCurrency as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     db.commit()
     db.refresh(current_user)
     return current_user
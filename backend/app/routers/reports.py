@@ -0,0 +1,52 @@
+"""Reports router."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.models.goal import Goal
+from app.auth.dependencies import get_current_user
+from app.services.reports import (DEFAULT_ANNUAL_RETURN, cached_report, parse_period, report_version,
+                                  simulation_report, statement_report)
+
+router = APIRouter()
+
+MEDIA_TYPES = {"pdf": "application/pdf", "csv": "text/csv"}
+
+
+def _file(content: bytes, filename: str, fmt: str) -> Response:
+    return Response(content, media_type=MEDIA_TYPES[fmt],
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/statement")
+def get_statement(period: str, format: str = Query("pdf", pattern="^(pdf|csv)$"),
+                  annual_return: float = Query(DEFAULT_ANNUAL_RETURN, ge=-50, le=50),
+                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    try:
+        parse_period(period)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    version = report_version(db, current_user, "statement", period, annual_return)
+    content = cached_report(current_user.id, f"statement-{period}", version,
+                            lambda: statement_report(db, current_user, period, annual_return), format)
+    return _file(content, f"statement-{period}.{format}", format)
+
+
+@router.get("/goals/{goal_id}/simulation")
+def get_goal_simulation(goal_id: int, format: str = Query("pdf", pattern="^(pdf|csv)$"),
+                        target_amount: float | None = Query(None, gt=0),
+                        monthly_contribution: float | None = Query(None, ge=0),
+                        annual_return: float = Query(DEFAULT_ANNUAL_RETURN, ge=-50, le=50),
+                        years: int | None = Query(None, ge=1, le=60),
+                        db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
+    if not goal:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
+    version = report_version(db, current_user, "simulation", goal.id, target_amount, monthly_contribution,
+                             annual_return, years)
+    content = cached_report(current_user.id, f"goal-{goal.id}-simulation", version,
+                            lambda: simulation_report(goal, target_amount, monthly_contribution, annual_return, years),
+                            format)
+    return _file(content, f"{goal.goal_type}-simulation.{format}", format)
@@ -1,5 +1,6 @@
 """Transactions router."""
 
+from datetime import datetime
 from decimal import Decimal
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.orm import Session
@@ -9,6 +10,9 @@ from app.models.user import User
 from app.models.investment import Investment
 from app.models.transaction import Transaction
 from app.schemas.investment import TransactionCreate, TransactionResponse
+from app.services.fx import UnknownCurrency, check_currency
+from app.services.tax_lots import LOT_METHODS, open_lot, dispose_lots, has_lot_records, reverse_transaction_lots
+from app.services.transaction_archive import user_transactions
 from pydantic import BaseModel
 from app.auth.dependencies import get_current_user
 
@@ -21,19 +25,37 @@ class TransactionUpdate(BaseModel):
     price: Decimal | None = None
     fees: Decimal | None = None
 
+# Fields the tax lot ledger was built from.
+LOT_FIELDS = ("symbol", "type", "quantity", "price")
+
 @router.get("", response_model=list[TransactionResponse])
-def list_transactions(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(Transaction).filter(Transaction.user_id == current_user.id).order_by(Transaction.executed_at.desc()).all()
+def list_transactions(start: datetime | None = None, end: datetime | None = None, db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)):
+    return user_transactions(db, current_user.id, start, end)
 
 
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 def record_transaction(data: TransactionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if data.lot_method not in LOT_METHODS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"lot_method must be one of {', '.join(LOT_METHODS)}")
+    try:
+        currency = check_currency(db, data.currency)
+    except UnknownCurrency as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    holding_currency = db.query(Investment.currency).filter(Investment.user_id == current_user.id,
+                                                            Investment.symbol == data.symbol).scalar()
+    if holding_currency is not None and holding_currency != currency:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"{data.symbol} is held in {holding_currency}, not {currency}")
     transaction = Transaction(user_id=current_user.id, symbol=data.symbol, type=data.type,
-                             quantity=data.quantity, price=data.price, fees=data.fees)
+                             quantity=data.quantity, price=data.price, fees=data.fees, currency=currency)
     db.add(transaction)
+    db.flush()
     
     # Update portfolio logic as it was in portfolio.py
     if data.type in ("buy", "contribution"):
+        open_lot(db, current_user.id, data.symbol, data.quantity, data.price,
+                 acquired_at=transaction.executed_at, transaction_id=transaction.id, currency=currency)
         cost_basis = data.quantity * data.price
         existing = db.query(Investment).filter(Investment.user_id == current_user.id, Investment.symbol == data.symbol).first()
         if existing:
@@ -46,10 +68,19 @@ def record_transaction(data: TransactionCreate, db: Session = Depends(get_db), c
             existing.last_price = data.price
         else:
             inv = Investment(user_id=current_user.id, asset_type="stock", symbol=data.symbol, units=data.quantity,
-                            avg_buy_price=data.price, cost_basis=cost_basis, current_value=cost_basis, last_price=data.price)
+                            avg_buy_price=data.price, cost_basis=cost_basis, current_value=cost_basis, last_price=data.price,
+                            currency=currency)
             db.add(inv)
     elif data.type in ("sell", "withdrawal"):
         existing = db.query(Investment).filter(Investment.user_id == current_user.id, Investment.symbol == data.symbol).first()
+        try:
+            dispose_lots(db, current_user.id, data.symbol, data.quantity, data.price, method=data.lot_method,
+                         lot_ids=data.lot_ids, held_units=existing.units if existing else None,
+                         fallback_unit_cost=existing.avg_buy_price if existing else None,
+                         disposed_at=transaction.executed_at, transaction_id=transaction.id, currency=currency)
+        except ValueError as exc:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
         if existing:
             old_units = existing.units
             existing.units = existing.units - data.quantity
@@ -70,8 +101,14 @@ def update_transaction(transaction_id: int, data: TransactionUpdate, db: Session
     transaction = db.query(Transaction).filter(Transaction.id == transaction_id, Transaction.user_id == current_user.id).first()
     if not transaction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
-        
-    for field, value in data.model_dump(exclude_unset=True).items():
+
+    changes = data.model_dump(exclude_unset=True)
+    changed_lot_fields = [f for f in LOT_FIELDS if f in changes and changes[f] != getattr(transaction, f)]
+    if changed_lot_fields and has_lot_records(db, current_user.id, transaction.id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Tax lots depend on this transaction's {', '.join(changed_lot_fields)}; "
+                                   "delete it and record it again instead")
+    for field, value in changes.items():
         setattr(transaction, field, value)
         
     db.commit()
@@ -83,7 +120,12 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db), curre
     transaction = db.query(Transaction).filter(Transaction.id == transaction_id, Transaction.user_id == current_user.id).first()
     if not transaction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
-        
+
+    try:
+        reverse_transaction_lots(db, current_user.id, transaction.id)
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
     db.delete(transaction)
     db.commit()
     return None
@@ -1,6 +1,6 @@
 """Auth schemas."""
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class LoginRequest(BaseModel):
@@ -13,6 +13,7 @@ class RegisterRequest(BaseModel):
     email: EmailStr
     password: str
     risk_profile: str = "moderate"
+    base_currency: str = Field("USD", min_length=3, max_length=3)
 
 
 class TokenResponse(BaseModel):
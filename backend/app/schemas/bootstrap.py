@@ -0,0 +1,18 @@
+"""Bootstrap (batched page data) schemas."""
+
+from pydantic import BaseModel
+
+from app.schemas.dashboard import DashboardSummary
+from app.schemas.goal import GoalResponse
+from app.schemas.investment import InvestmentResponse, TransactionResponse
+from app.schemas.portfolio import AllocationResponse
+from app.schemas.user import UserResponse
+
+
+class BootstrapResponse(BaseModel):
+    profile: UserResponse | None = None
+    dashboard_summary: DashboardSummary | None = None
+    goals: list[GoalResponse] | None = None
+    investments: list[InvestmentResponse] | None = None
+    allocation: AllocationResponse | None = None
+    transactions: list[TransactionResponse] | None = None
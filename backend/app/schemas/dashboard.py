@@ -17,9 +17,12 @@ class GoalProgressItem(BaseModel):
     target_date: str
     status: str
     monthly_contribution: Decimal
+    funded_amount: Decimal = 0
+    progress_percentage: float = 0
 
 
 class DashboardSummary(BaseModel):
+    currency: str = "USD"
     total_invested: Decimal
     total_current_value: Decimal
     total_profit_loss: Decimal
@@ -2,7 +2,7 @@
 
 from datetime import date, datetime
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class GoalBase(BaseModel):
@@ -28,7 +28,23 @@ class GoalUpdate(BaseModel):
 class GoalResponse(GoalBase):
     id: int
     user_id: int
+    funded_amount: Decimal = 0
+    progress_percentage: float = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class EarmarkCreate(BaseModel):
+    investment_id: int
+    percentage: Decimal = Field(default=100, gt=0, le=100)
+
+
+class EarmarkResponse(BaseModel):
+    id: int
+    goal_id: int
+    investment_id: int
+    symbol: str
+    percentage: Decimal
+    earmarked_value: Decimal
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class InvestmentCreate(BaseModel):
@@ -10,6 +10,7 @@ class InvestmentCreate(BaseModel):
     symbol: str
     units: Decimal
     avg_buy_price: Decimal
+    currency: str = Field("USD", min_length=3, max_length=3)
 
 class InvestmentUpdate(BaseModel):
     units: Decimal | None = None
@@ -28,6 +29,7 @@ class InvestmentResponse(BaseModel):
     avg_buy_price: Decimal
     cost_basis: Decimal
     current_value: Decimal
+    currency: str = "USD"
     last_price: Decimal | None = None
     last_price_at: datetime | None = None
 
@@ -41,6 +43,9 @@ class TransactionCreate(BaseModel):
     quantity: Decimal
     price: Decimal
     fees: Decimal = 0
+    currency: str = Field("USD", min_length=3, max_length=3)
+    lot_method: str = "fifo"
+    lot_ids: list[int] | None = None
 
 
 class TransactionResponse(BaseModel):
@@ -51,6 +56,7 @@ class TransactionResponse(BaseModel):
     quantity: Decimal
     price: Decimal
     fees: Decimal
+    currency: str = "USD"
     executed_at: datetime
 
     class Config:
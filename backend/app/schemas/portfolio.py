@@ -1,10 +1,12 @@
 """Portfolio schemas."""
 
+from datetime import date
 from decimal import Decimal
 from pydantic import BaseModel
 from app.schemas.dashboard import AssetAllocationItem
 
 class PortfolioSummary(BaseModel):
+    currency: str = "USD"
     total_invested: Decimal
     total_current_value: Decimal
     total_profit_loss: Decimal
@@ -16,5 +18,45 @@ class AllocationItem(BaseModel):
     percentage: float
 
 class AllocationResponse(BaseModel):
+    currency: str = "USD"
     total_value: float
     allocation: list[AllocationItem]
+
+class RiskMetrics(BaseModel):
+    as_of: date
+    currency: str = "USD"
+    confidence: float
+    portfolio_value: float
+    covered_value: float
+    volatility_daily: float
+    volatility_annual: float
+    var_historical: float
+    var_parametric: float
+    max_drawdown: float
+    uncovered_symbols: list[str]
+
+
+class TargetAllocationItem(BaseModel):
+    asset_class: str
+    current_value: float
+    current_percentage: float
+    target_percentage: float
+    drift: float
+
+
+class RebalanceTrade(BaseModel):
+    asset_class: str
+    symbol: str | None = None
+    action: str
+    amount: float
+    units: float | None = None
+
+
+class RebalancePlan(BaseModel):
+    risk_profile: str | None = None
+    currency: str = "USD"
+    total_value: float
+    max_drift: float
+    needs_rebalance: bool
+    allocation: list[TargetAllocationItem]
+    trades: list[RebalanceTrade]
@@ -0,0 +1,54 @@
+"""Tax lot and capital gains schemas."""
+
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+class TaxLotResponse(BaseModel):
+    id: int
+    user_id: int
+    transaction_id: int | None = None
+    symbol: str
+    quantity: Decimal
+    remaining_quantity: Decimal
+    unit_cost: Decimal
+    currency: str = "USD"
+    acquired_at: datetime
+    closed_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class RealisedGainItem(BaseModel):
+    symbol: str
+    currency: str = "USD"
+    lot_id: int | None = None
+    quantity: Decimal
+    acquired_at: datetime | None = None
+    disposed_at: datetime
+    cost_basis: Decimal
+    proceeds: Decimal
+    gain: Decimal
+    term: str
+
+
+class UnrealisedGainItem(BaseModel):
+    symbol: str
+    currency: str = "USD"
+    quantity: Decimal
+    cost_basis: Decimal
+    market_value: Decimal
+    gain: Decimal
+
+
+class GainsReport(BaseModel):
+    tax_year: int
+    currency: str = "USD"
+    realised_total: Decimal
+    short_term_total: Decimal
+    long_term_total: Decimal
+    unrealised_total: Decimal
+    realised: list[RealisedGainItem]
+    unrealised: list[UnrealisedGainItem]
@@ -1,7 +1,7 @@
 """User schemas."""
 
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class UserResponse(BaseModel):
@@ -11,6 +11,7 @@ class UserResponse(BaseModel):
     name: str
     email: str
     risk_profile: str
+    base_currency: str = "USD"
     kyc_status: str
     created_at: datetime
 
@@ -18,3 +19,4 @@ class UserResponse(BaseModel):
 class UserUpdate(BaseModel):
     name: str | None = None
     risk_profile: str | None = None
+    base_currency: str | None = Field(None, min_length=3, max_length=3)
@@ -1 +1,4 @@
 """Services module."""
+
+# Registers the session flush listeners that maintain goal funding and user data versions.
+from app.services import goal_funding, user_versions  # noqa: F401
@@ -0,0 +1,118 @@
+"""Resolve several page resources for one user in a single session.
+
+`BootstrapContext` loads each underlying dataset at most once, so the
+holdings behind the dashboard summary, the allocation and the investment
+list come from one query, and the goals behind the goal list and the
+dashboard's goal progress from another.
+"""
+
+from decimal import Decimal
+from functools import cached_property
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.goal import Goal
+from app.models.investment import Investment
+from app.models.user import User
+from app.schemas.dashboard import AssetAllocationItem, GoalProgressItem
+from app.services.fx import convert_totals, get_fx_snapshot
+from app.services.transaction_archive import user_transactions
+
+
+class BootstrapContext:
+    """Memoised datasets and derived aggregates for one user."""
+
+    def __init__(self, db: Session, user: User, transaction_limit: Optional[int] = None):
+        self.db = db
+        self.user = user
+        self.transaction_limit = transaction_limit
+
+    @cached_property
+    def holdings(self) -> list[Investment]:
+        return self.db.query(Investment).filter(Investment.user_id == self.user.id).all()
+
+    @cached_property
+    def goals(self) -> list[Goal]:
+        return self.db.query(Goal).filter(Goal.user_id == self.user.id).all()
+
+    @property
+    def currency(self) -> str:
+        return self.user.base_currency or "USD"
+
+    @cached_property
+    def converted(self) -> tuple[Decimal, Decimal, dict[str, Decimal]]:
+        rows = [(h.asset_type, h.currency, h.cost_basis, h.current_value) for h in self.holdings]
+        return convert_totals(get_fx_snapshot(self.db), rows, self.currency)
+
+    @property
+    def totals(self) -> tuple[Decimal, Decimal]:
+        return self.converted[:2]
+
+    @property
+    def value_by_asset_type(self) -> dict[str, Decimal]:
+        return self.converted[2]
+
+    def profile(self) -> User:
+        return self.user
+
+    def investments(self) -> list[Investment]:
+        return self.holdings
+
+    def dashboard_summary(self) -> dict:
+        total_invested, total_current_value = self.totals
+        asset_allocation = []
+        for asset_type, value in self.value_by_asset_type.items():
+            pct = float(value / total_current_value * 100) if total_current_value > 0 else 0
+            asset_allocation.append(AssetAllocationItem(asset_type=asset_type, value=value, percentage=round(pct, 2)))
+        return {
+            "currency": self.currency,
+            "total_invested": total_invested,
+            "total_current_value": total_current_value,
+            "total_profit_loss": total_current_value - total_invested,
+            "asset_allocation": asset_allocation,
+            "active_goals_count": sum(1 for g in self.goals if g.status == "active"),
+            "goal_progress_summary": [
+                GoalProgressItem(id=g.id, goal_type=g.goal_type, target_amount=g.target_amount,
+                                 target_date=g.target_date.isoformat(), status=g.status,
+                                 monthly_contribution=g.monthly_contribution,
+                                 funded_amount=g.funded_amount or 0, progress_percentage=g.progress_percentage)
+                for g in self.goals[:10]
+            ],
+        }
+
+    def allocation(self) -> dict:
+        _, total = self.totals
+        return {
+            "currency": self.currency,
+            "total_value": float(total),
+            "allocation": [
+                {"asset_class": asset_type, "total_value": float(value),
+                 "percentage": round(float(value) / float(total) * 100, 2) if total > 0 else 0}
+                for asset_type, value in self.value_by_asset_type.items()
+            ],
+        }
+
+    def transactions(self) -> list:
+        return user_transactions(self.db, self.user.id, limit=self.transaction_limit)
+
+    def list_goals(self) -> list[Goal]:
+        return self.goals
+
+
+RESOURCES = {
+    "profile": BootstrapContext.profile,
+    "dashboard_summary": BootstrapContext.dashboard_summary,
+    "goals": BootstrapContext.list_goals,
+    "investments": BootstrapContext.investments,
+    "allocation": BootstrapContext.allocation,
+    "transactions": BootstrapContext.transactions,
+}
+
+
+def resolve(db: Session, user: User, keys: list[str], transaction_limit: Optional[int] = None) -> dict:
+    unknown = [key for key in keys if key not in RESOURCES]
+    if unknown:
+        raise KeyError(", ".join(unknown))
+    ctx = BootstrapContext(db, user, transaction_limit)
+    return {key: RESOURCES[key](ctx) for key in dict.fromkeys(keys)}
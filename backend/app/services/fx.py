@@ -0,0 +1,173 @@
+"""FX rates: providers, the fx_rates table and an in-memory rate snapshot.
+
+Rates are stored as the USD value of one unit of each currency. Requests
+convert through an immutable `FxSnapshot` held in process memory and
+re-read from the table at most every FX_SNAPSHOT_TTL_SECONDS; each reload
+gets a new version number, so anything cached against a snapshot can tell
+when rates moved. Reading a snapshot never writes: an empty table is
+seeded on startup (`seed_fx_rates`) or by refresh_fx.py.
+"""
+
+import itertools
+import json
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.fx_rate import FxRate
+from app.models.investment import Investment
+
+CENT = Decimal("0.01")
+
+
+class UnknownCurrency(ValueError):
+    pass
+
+
+class FixtureFxProvider:
+    """Rates from a local JSON fixture: {"as_of": ..., "rates": {"EUR": "1.08", ...}}."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_settings().FX_FIXTURE_PATH
+
+    def fetch(self) -> tuple[date, dict[str, Decimal]]:
+        with open(self.path) as f:
+            data = json.load(f)
+        return date.fromisoformat(data["as_of"]), {ccy.upper(): Decimal(str(rate)) for ccy, rate in data["rates"].items()}
+
+
+class FxSnapshot:
+    """Immutable set of USD rates with Decimal and vectorised conversion."""
+
+    def __init__(self, version: int, as_of: Optional[date], rates: dict[str, Decimal]):
+        self.version = version
+        self.as_of = as_of
+        self.rates = dict(rates)
+        self.currencies = tuple(sorted(rates))
+        self.index = {ccy: i for i, ccy in enumerate(self.currencies)}
+        self.usd = np.array([float(rates[ccy]) for ccy in self.currencies])
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.rates
+
+    def rate(self, from_currency: str, to_currency: str) -> Decimal:
+        if from_currency == to_currency:
+            return Decimal(1)
+        try:
+            return self.rates[from_currency] / self.rates[to_currency]
+        except KeyError as exc:
+            raise UnknownCurrency(f"No FX rate for {exc.args[0]}")
+
+    def convert(self, amount, from_currency: str, to_currency: str) -> Decimal:
+        return Decimal(amount or 0) * self.rate(from_currency, to_currency)
+
+    def factors(self, currencies: Sequence[str], to_currency: str) -> np.ndarray:
+        """Per-element conversion factors into `to_currency` as one array."""
+        try:
+            idx = np.fromiter((self.index[c] for c in currencies), dtype=np.intp, count=len(currencies))
+            return self.usd[idx] / self.usd[self.index[to_currency]]
+        except KeyError as exc:
+            raise UnknownCurrency(f"No FX rate for {exc.args[0]}")
+
+    def convert_many(self, amounts, currencies: Sequence[str], to_currency: str) -> np.ndarray:
+        return np.asarray(amounts, dtype=float) * self.factors(currencies, to_currency)
+
+
+_versions = itertools.count(1)
+_snapshot: Optional[FxSnapshot] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def refresh_fx_rates(db: Session, provider=None) -> FxSnapshot:
+    """Pull rates from `provider` into fx_rates and publish a new snapshot."""
+    as_of, rates = (provider or FixtureFxProvider()).fetch()
+    for currency, usd_rate in rates.items():
+        db.merge(FxRate(currency=currency, usd_rate=usd_rate, as_of=as_of, updated_at=datetime.utcnow()))
+    db.commit()
+    return _publish(as_of, rates)
+
+
+def _publish(as_of: Optional[date], rates: dict[str, Decimal]) -> FxSnapshot:
+    global _snapshot, _loaded_at
+    snapshot = FxSnapshot(next(_versions), as_of, rates)
+    with _lock:
+        _snapshot, _loaded_at = snapshot, time.monotonic()
+    return snapshot
+
+
+def seed_fx_rates(engine: Engine, provider=None) -> bool:
+    """Load rates into an empty fx_rates table in its own session; returns whether it did."""
+    with Session(bind=engine) as db:
+        if db.query(FxRate.currency).first() is not None:
+            return False
+        refresh_fx_rates(db, provider)
+    return True
+
+
+def get_fx_snapshot(db: Session) -> FxSnapshot:
+    """Current snapshot, reloading from fx_rates once the TTL has passed.
+
+    Only reads through `db`, so callers keep control of their transaction.
+    If the table is still empty, the fixture's rates are used unsaved.
+    """
+    global _loaded_at
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _loaded_at < get_settings().FX_SNAPSHOT_TTL_SECONDS:
+        return snapshot
+    rows = db.query(FxRate).all()
+    if rows:
+        rates = {row.currency: Decimal(row.usd_rate) for row in rows}
+        as_of = max(row.as_of for row in rows)
+    else:
+        as_of, rates = FixtureFxProvider().fetch()
+    if snapshot is not None and snapshot.rates == rates and snapshot.as_of == as_of:
+        # Unchanged rates keep their version so downstream caches stay valid.
+        with _lock:
+            _loaded_at = time.monotonic()
+        return snapshot
+    return _publish(as_of, rates)
+
+
+def convert_totals(snapshot: FxSnapshot, rows, to_currency: str) -> tuple[Decimal, Decimal, dict[str, Decimal]]:
+    """Convert (asset_type, currency, invested, current) grouped sums into one currency.
+
+    Returns (total invested, total current value, current value by asset type),
+    all rounded to cents.
+    """
+    invested = current = Decimal(0)
+    by_asset_type: dict[str, Decimal] = {}
+    for asset_type, currency, row_invested, row_current in rows:
+        rate = snapshot.rate(currency or "USD", to_currency)
+        invested += Decimal(row_invested or 0) * rate
+        value = Decimal(row_current or 0) * rate
+        current += value
+        by_asset_type[asset_type] = by_asset_type.get(asset_type, Decimal(0)) + value
+    return (invested.quantize(CENT), current.quantize(CENT),
+            {asset_type: value.quantize(CENT) for asset_type, value in by_asset_type.items()})
+
+
+def check_currency(db: Session, currency: str) -> str:
+    """Normalise a currency code, raising UnknownCurrency if it has no rate."""
+    currency = currency.upper()
+    if currency not in get_fx_snapshot(db):
+        raise UnknownCurrency(f"Unsupported currency {currency}")
+    return currency
+
+
+def holding_totals(db: Session, user_id: int, to_currency: str) -> tuple[Decimal, Decimal, dict[str, Decimal]]:
+    """A user's invested and current totals in `to_currency`, summed per currency in SQL."""
+    rows = db.query(
+        Investment.asset_type, Investment.currency,
+        func.coalesce(func.sum(Investment.cost_basis), 0),
+        func.coalesce(func.sum(Investment.current_value), 0),
+    ).filter(Investment.user_id == user_id).group_by(Investment.asset_type, Investment.currency).all()
+    return convert_totals(get_fx_snapshot(db), rows, to_currency)
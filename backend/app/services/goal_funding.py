@@ -0,0 +1,125 @@
+"""Goal funding built on earmarked holdings.
+
+The flush listeners below keep `Goal.funded_amount` current. They are
+registered when `app.services` is first imported.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import bindparam, event, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.models.goal import Goal
+from app.models.goal_earmark import GoalEarmark
+from app.models.investment import Investment
+from app.models.user import User
+from app.services.fx import CENT, get_fx_snapshot
+
+
+def earmark_contribution(value, percentage) -> Decimal:
+    """One earmark's share of a goal's funded amount, rounded as it is stored."""
+    return (Decimal(value or 0) * Decimal(percentage or 0) / 100).quantize(CENT)
+
+
+def funded_amounts(session: Session, goal_ids=None, user_id: Optional[int] = None) -> dict[int, Decimal]:
+    """Funded amount per goal in its owner's base currency.
+
+    Each earmark's holding value is converted at the current FX snapshot and
+    rounded to cents before summing. Goals without earmarks are omitted.
+    """
+    query = (select(GoalEarmark.goal_id, GoalEarmark.percentage, Investment.current_value, Investment.currency,
+                    User.base_currency)
+             .join(Investment, Investment.id == GoalEarmark.investment_id)
+             .join(User, User.id == GoalEarmark.user_id))
+    if goal_ids is not None:
+        query = query.where(GoalEarmark.goal_id.in_(goal_ids))
+    if user_id is not None:
+        query = query.where(GoalEarmark.user_id == user_id)
+    snapshot = get_fx_snapshot(session)
+    totals: dict[int, Decimal] = defaultdict(Decimal)
+    for row in session.connection().execute(query):
+        value = snapshot.convert(row.current_value, row.currency or "USD", row.base_currency or "USD")
+        totals[row.goal_id] += earmark_contribution(value, row.percentage)
+    return dict(totals)
+
+
+@event.listens_for(Session, "before_flush")
+def _drop_earmarks_of_deleted_holdings(session: Session, flush_context, instances) -> None:
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Investment)]
+    if deleted:
+        for earmark in session.query(GoalEarmark).filter(GoalEarmark.investment_id.in_(deleted)):
+            session.delete(earmark)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_goal_funding(session: Session, flush_context) -> None:
+    """Refresh `Goal.funded_amount` for the goals this flush touched.
+
+    A goal's funded amount is the sum over its earmarks of current_value *
+    percentage / 100, converted to the owner's base currency and rounded to
+    cents per earmark. Flushes that revalue a holding, change an earmark or
+    switch a user's base currency re-sum only the affected goals' earmarks,
+    in the same transaction. Because holdings can be in several currencies,
+    the goal is re-summed rather than adjusted by a delta; a delta taken at
+    today's FX rate would not cancel the contribution stored at an earlier
+    rate. Bulk `query.update()` calls and FX refreshes bypass this hook;
+    `recompute_goal_funding` reconciles after those.
+    """
+    goal_ids = set()
+    investment_ids = set()
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, GoalEarmark):
+            goal_ids.add(obj.goal_id)
+        elif isinstance(obj, Investment) and obj not in session.new and (
+                get_history(obj, "current_value").has_changes() or get_history(obj, "currency").has_changes()):
+            investment_ids.add(obj.id)
+        elif isinstance(obj, User) and obj not in session.new and get_history(obj, "base_currency").has_changes():
+            user_ids.add(obj.id)
+    conn = session.connection()
+    if investment_ids:
+        goal_ids.update(conn.execute(select(GoalEarmark.goal_id).where(GoalEarmark.investment_id.in_(investment_ids))).scalars())
+    if user_ids:
+        goal_ids.update(conn.execute(select(Goal.id).where(Goal.user_id.in_(user_ids))).scalars())
+    goal_ids.discard(None)
+    if not goal_ids:
+        return
+
+    totals = funded_amounts(session, goal_ids)
+    conn.execute(update(Goal.__table__).where(Goal.__table__.c.id == bindparam("goal_id")),
+                 [{"goal_id": goal_id, "funded_amount": totals.get(goal_id, Decimal(0))} for goal_id in goal_ids])
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Goal) and obj.id in goal_ids:
+            session.expire(obj, ["funded_amount"])
+
+
+def earmarked_percentage(db: Session, investment_id: int, exclude_goal_id: Optional[int] = None) -> Decimal:
+    """Share of a holding already earmarked across goals."""
+    query = db.query(func.coalesce(func.sum(GoalEarmark.percentage), 0)).filter(GoalEarmark.investment_id == investment_id)
+    if exclude_goal_id is not None:
+        query = query.filter(GoalEarmark.goal_id != exclude_goal_id)
+    return Decimal(query.scalar() or 0)
+
+
+def recompute_goal_funding(db: Session, user_id: Optional[int] = None) -> int:
+    """Rebuild funded_amount from scratch, e.g. after bulk price updates or an FX refresh.
+
+    The flush hook keeps goals current on every ORM write; this full
+    join-and-sum is only for reconciliation. Returns the goals updated.
+    """
+    totals = funded_amounts(db, user_id=user_id)
+    goals = db.query(Goal)
+    if user_id is not None:
+        goals = goals.filter(Goal.user_id == user_id)
+
+    updated = 0
+    for goal in goals:
+        amount = totals.get(goal.id, Decimal(0))
+        if goal.funded_amount != amount:
+            goal.funded_amount = amount
+            updated += 1
+    db.commit()
+    return updated
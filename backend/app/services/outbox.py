@@ -0,0 +1,220 @@
+"""Drain the outbox into the append-only event log and fan out to subscribers.
+
+Write paths only insert outbox rows (see app.models.outbox). The
+dispatcher claims pending rows in id order, appends them to the event log
+in one write per batch, marks them dispatched and then hands the batch to
+subscribers. Delivery is at-least-once: a crash between the log write and
+the commit re-sends that batch, so consumers should dedupe on event id.
+
+Each shard has its own outbox and event ids, so with more than one shard
+every shard's events go to their own subdirectory of the event log.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.sharding import DEFAULT_SHARD
+from app.database import SessionLocal, shard_router
+from app.models.outbox import OutboxEvent, outbox_pending
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[list[dict]], None]
+_subscribers: list[tuple[Subscriber, Optional[frozenset]]] = []
+
+
+def subscribe(handler: Subscriber, entities=None) -> Subscriber:
+    """Register `handler` for dispatched batches, optionally only for some entities."""
+    _subscribers.append((handler, frozenset(entities) if entities else None))
+    return handler
+
+
+def unsubscribe(handler: Subscriber) -> None:
+    _subscribers[:] = [(h, e) for h, e in _subscribers if h is not handler]
+
+
+def _publish(events: list[dict]) -> None:
+    for handler, entities in list(_subscribers):
+        selected = events if entities is None else [e for e in events if e["entity"] in entities]
+        if not selected:
+            continue
+        try:
+            handler(selected)
+        except Exception:
+            # A failing subscriber must not stall the log; it can replay from the sink.
+            logger.exception("Event subscriber %r failed", handler)
+
+
+class FileEventSink:
+    """Append-only JSON-lines event log, one file per UTC day."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or get_settings().EVENT_LOG_DIR
+
+    def path(self, day) -> str:
+        return os.path.join(self.root, f"events-{day:%Y-%m-%d}.jsonl")
+
+    def append(self, events: list[dict]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        by_day: dict[str, list[str]] = {}
+        for e in events:
+            by_day.setdefault(self.path(datetime.fromisoformat(e["occurred_at"])), []).append(
+                json.dumps(e, separators=(",", ":")) + "\n")
+        for path, lines in by_day.items():
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, after_id: int = 0) -> Iterator[dict]:
+        """Replay events with id > `after_id`, oldest file first."""
+        if not os.path.isdir(self.root):
+            return
+        for name in sorted(os.listdir(self.root)):
+            if not (name.startswith("events-") and name.endswith(".jsonl")):
+                continue
+            with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                for line in f:
+                    event = json.loads(line)
+                    if event["id"] > after_id:
+                        yield event
+
+
+def _as_event(row: OutboxEvent) -> dict:
+    return {
+        "id": row.id,
+        "occurred_at": row.occurred_at.isoformat(),
+        "actor_id": row.actor_id,
+        "user_id": row.user_id,
+        "entity": row.entity,
+        "entity_id": row.entity_id,
+        "action": row.action,
+        "changes": row.changes,
+    }
+
+
+def dispatch_batch(db: Session, sink, batch_size: int = 500) -> int:
+    """Move up to `batch_size` pending events to `sink`; returns how many."""
+    rows = (db.query(OutboxEvent).filter(OutboxEvent.dispatched_at.is_(None)).order_by(OutboxEvent.id)
+            .limit(batch_size).with_for_update(skip_locked=True).all())
+    if not rows:
+        db.rollback()
+        return 0
+    events = [_as_event(row) for row in rows]
+    sink.append(events)
+    db.execute(update(OutboxEvent).where(OutboxEvent.id.in_([e["id"] for e in events]))
+               .values(dispatched_at=datetime.utcnow()).execution_options(synchronize_session=False))
+    db.commit()
+    _publish(events)
+    return len(events)
+
+
+def purge_dispatched(db: Session, older_than: timedelta) -> int:
+    """Delete outbox rows dispatched before now - `older_than`; the event log keeps them."""
+    cutoff = datetime.utcnow() - older_than
+    result = db.execute(delete(OutboxEvent).where(OutboxEvent.dispatched_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+def drain(db: Session, sink, batch_size: int = 500) -> int:
+    total = 0
+    while True:
+        count = dispatch_batch(db, sink, batch_size)
+        total += count
+        if count < batch_size:
+            return total
+
+
+class OutboxDispatcher:
+    """Background thread draining the outbox every poll interval, or sooner on commit."""
+
+    def __init__(self, sink=None, batch_size: Optional[int] = None, poll_seconds: Optional[float] = None,
+                 session_factory=SessionLocal, name: str = "outbox-dispatcher", shard: str = DEFAULT_SHARD):
+        settings = get_settings()
+        self.sink = sink or FileEventSink()
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.OUTBOX_POLL_SECONDS
+        self.retention = timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        self.session_factory = session_factory
+        self.name = name
+        self.dispatched_total = 0
+        self._stop = threading.Event()
+        self._pending = outbox_pending(shard)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        last_purge = 0.0
+        while not self._stop.is_set():
+            self._pending.clear()
+            db = self.session_factory()
+            try:
+                self.dispatched_total += drain(db, self.sink, self.batch_size)
+                if time.monotonic() - last_purge > 3600:
+                    purge_dispatched(db, self.retention)
+                    last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Outbox dispatch failed; retrying")
+                db.rollback()
+            finally:
+                db.close()
+            self._pending.wait(self.poll_seconds)
+        # Final drain so a clean shutdown leaves nothing committed but unlogged.
+        db = self.session_factory()
+        try:
+            self.dispatched_total += drain(db, self.sink, self.batch_size)
+        except Exception:
+            logger.exception("Final outbox drain failed")
+        finally:
+            db.close()
+
+
+def shard_dispatchers(log_dir: Optional[str] = None) -> list[OutboxDispatcher]:
+    """One dispatcher per shard in the current shard map."""
+    root = log_dir or get_settings().EVENT_LOG_DIR
+    shards = shard_router.names()
+    return [OutboxDispatcher(FileEventSink(os.path.join(root, shard) if len(shards) > 1 else root),
+                             session_factory=partial(shard_router.session, shard), name=f"outbox-dispatcher-{shard}",
+                             shard=shard)
+            for shard in shards]
+
+
+_dispatchers: list[OutboxDispatcher] = []
+
+
+def start_dispatcher() -> list[OutboxDispatcher]:
+    """Start dispatching every shard's outbox; shards added later need a restart."""
+    if not _dispatchers:
+        _dispatchers.extend(shard_dispatchers())
+        for dispatcher in _dispatchers:
+            dispatcher.start()
+    return _dispatchers
+
+
+def stop_dispatcher() -> None:
+    for dispatcher in _dispatchers:
+        dispatcher.stop()
+    _dispatchers.clear()
@@ -0,0 +1,175 @@
+"""Local daily price history store.
+
+Each symbol is a directory holding two append-only column files:
+`dates.i4` (days since 1970-01-01, strictly increasing) and `close.f8`.
+Reads memory-map the columns, so slicing a date range returns views into
+the page cache rather than copies, and the sorted date column doubles as
+the index via binary search.
+"""
+
+import csv
+import os
+import re
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+
+DATE_DTYPE = np.dtype("<i4")
+PRICE_DTYPE = np.dtype("<f8")
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def to_day(value) -> int:
+    """Convert a date / ISO string / datetime64 to days since epoch."""
+    return int((np.datetime64(value, "D") - _EPOCH).astype(np.int64))
+
+
+def from_day(days: int) -> date:
+    return (_EPOCH + np.timedelta64(int(days), "D")).astype(date)
+
+
+class PriceStore:
+    """Columnar, memory-mapped, append-only price history keyed by symbol."""
+
+    def __init__(self, root: str):
+        self.root = root
+        # Keyed by symbol directory, so symbols that sanitise to the same directory share one entry.
+        self._maps: dict[str, tuple[tuple[int, int], np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9._-]", "_", symbol.upper()))
+
+    def symbols(self) -> list[str]:
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def _columns(self, symbol: str) -> tuple[np.ndarray, np.ndarray]:
+        """Memory-mapped (dates, closes) for a symbol, remapped if the files grew."""
+        path = self._symbol_dir(symbol)
+        dates_path = os.path.join(path, "dates.i4")
+        close_path = os.path.join(path, "close.f8")
+        if not os.path.exists(dates_path):
+            return np.empty(0, DATE_DTYPE), np.empty(0, PRICE_DTYPE)
+
+        sizes = (os.path.getsize(dates_path), os.path.getsize(close_path) if os.path.exists(close_path) else 0)
+        cached = self._maps.get(path)
+        if cached is not None and cached[0] == sizes:
+            return cached[1], cached[2]
+
+        # A crash between the two column writes can leave one column longer
+        # (or a partial row); only rows present in both are visible, and the
+        # next append trims the excess.
+        rows = min(sizes[0] // DATE_DTYPE.itemsize, sizes[1] // PRICE_DTYPE.itemsize)
+        if rows == 0:
+            dates, closes = np.empty(0, DATE_DTYPE), np.empty(0, PRICE_DTYPE)
+        else:
+            dates = np.memmap(dates_path, dtype=DATE_DTYPE, mode="r", shape=(rows,))
+            closes = np.memmap(close_path, dtype=PRICE_DTYPE, mode="r", shape=(rows,))
+        with self._lock:
+            self._maps[path] = (sizes, dates, closes)
+        return dates, closes
+
+    @staticmethod
+    def _trim(path: str) -> None:
+        """Cut both column files back to the rows they have in common."""
+        files = ((os.path.join(path, "dates.i4"), DATE_DTYPE), (os.path.join(path, "close.f8"), PRICE_DTYPE))
+        sizes = [os.path.getsize(name) if os.path.exists(name) else 0 for name, _ in files]
+        rows = min(size // dtype.itemsize for size, (_, dtype) in zip(sizes, files))
+        for size, (name, dtype) in zip(sizes, files):
+            if size != rows * dtype.itemsize:
+                with open(name, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+
+    def last_date(self, symbol: str) -> Optional[date]:
+        dates, _ = self._columns(symbol)
+        return from_day(dates[-1]) if len(dates) else None
+
+    def append(self, symbol: str, dates: Iterable, closes: Iterable[float]) -> int:
+        """Append rows newer than the stored history; returns rows written.
+
+        Input is sorted by date first; rows on or before the last stored date
+        are dropped so re-running a load is idempotent.
+        """
+        days = (np.asarray(list(dates), dtype="datetime64[D]") - _EPOCH).astype(DATE_DTYPE)
+        prices = np.asarray(list(closes), dtype=PRICE_DTYPE)
+        if len(days) != len(prices):
+            raise ValueError("dates and closes must be the same length")
+        order = np.argsort(days, kind="stable")
+        days, prices = days[order], prices[order]
+        keep = np.ones(len(days), dtype=bool)
+        keep[1:] = days[1:] != days[:-1]
+        existing, _ = self._columns(symbol)
+        if len(existing):
+            keep &= days > existing[-1]
+        days, prices = days[keep], prices[keep]
+        if not len(days):
+            return 0
+
+        path = self._symbol_dir(symbol)
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            self._trim(path)
+            with open(os.path.join(path, "close.f8"), "ab") as f:
+                f.write(prices.tobytes())
+            with open(os.path.join(path, "dates.i4"), "ab") as f:
+                f.write(days.tobytes())
+            self._maps.pop(path, None)
+        return len(days)
+
+    def series(self, symbol: str, start=None, end=None) -> tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (dates, closes) views for start <= date <= end."""
+        dates, closes = self._columns(symbol)
+        lo = np.searchsorted(dates, to_day(start), side="left") if start is not None else 0
+        hi = np.searchsorted(dates, to_day(end), side="right") if end is not None else len(dates)
+        return dates[lo:hi], closes[lo:hi]
+
+    def range(self, symbols: Iterable[str], start=None, end=None) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """Zero-copy views for several symbols over the same date range."""
+        return {symbol: self.series(symbol, start, end) for symbol in symbols}
+
+    def aligned(self, symbols: list[str], start=None, end=None) -> tuple[np.ndarray, np.ndarray]:
+        """Closes for `symbols` on a shared calendar as a (days, symbols) matrix.
+
+        The calendar is the union of trading days in range; gaps are forward
+        filled and leading gaps stay NaN. This materialises a copy.
+        """
+        views = self.range(symbols, start, end)
+        if not views:
+            return np.empty(0, DATE_DTYPE), np.empty((0, 0), PRICE_DTYPE)
+        calendar = np.unique(np.concatenate([d for d, _ in views.values()]))
+        matrix = np.full((len(calendar), len(symbols)), np.nan, dtype=PRICE_DTYPE)
+        for col, symbol in enumerate(symbols):
+            dates, closes = views[symbol]
+            if not len(dates):
+                continue
+            idx = np.searchsorted(dates, calendar, side="right") - 1
+            valid = idx >= 0
+            matrix[valid, col] = closes[idx[valid]]
+        return calendar, matrix
+
+    def load_csv(self, path: str) -> dict[str, int]:
+        """Bulk load a long-format CSV with `symbol,date,close` columns."""
+        rows: dict[str, tuple[list, list]] = defaultdict(lambda: ([], []))
+        with open(path, newline="") as f:
+            for record in csv.DictReader(f):
+                dates, closes = rows[record["symbol"].strip()]
+                dates.append(record["date"].strip())
+                closes.append(float(record["close"]))
+        return {symbol: self.append(symbol, dates, closes) for symbol, (dates, closes) in rows.items()}
+
+
+_store: Optional[PriceStore] = None
+
+
+def get_price_store() -> PriceStore:
+    """Process-wide store rooted at PRICE_STORE_DIR."""
+    global _store
+    if _store is None:
+        _store = PriceStore(get_settings().PRICE_STORE_DIR)
+    return _store
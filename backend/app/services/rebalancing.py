@@ -0,0 +1,150 @@
+"""Target allocations per risk profile, rebalancing trades and drift scoring."""
+
+from typing import Iterator, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.investment import Investment
+from app.models.user import User
+from app.services.fx import get_fx_snapshot
+
+ASSET_CLASSES = ("stock", "bond", "crypto")
+
+TARGET_ALLOCATIONS = {
+    "conservative": {"stock": 0.30, "bond": 0.70, "crypto": 0.00},
+    "moderate": {"stock": 0.55, "bond": 0.40, "crypto": 0.05},
+    "aggressive": {"stock": 0.70, "bond": 0.15, "crypto": 0.15},
+}
+
+DEFAULT_DRIFT_THRESHOLD = 5.0  # percentage points
+
+
+def target_allocation(risk_profile: Optional[str]) -> dict[str, float]:
+    return TARGET_ALLOCATIONS.get(risk_profile or "moderate", TARGET_ALLOCATIONS["moderate"])
+
+
+def rebalance_plan(db: Session, user: User, threshold: float = DEFAULT_DRIFT_THRESHOLD) -> dict:
+    """Trades that move the user's holdings onto their risk profile's target.
+
+    Each asset class's shortfall or excess is split across its holdings in
+    proportion to their value. A class with a target but no holdings gets a
+    single trade without a symbol. Asset classes outside the template have
+    a zero target.
+    """
+    target = target_allocation(user.risk_profile)
+    currency = user.base_currency or "USD"
+    holdings = db.query(Investment).filter(Investment.user_id == user.id).all()
+    # Values and trade amounts are in the user's base currency; `rates` maps back for unit counts.
+    rates = dict(zip((inv.id for inv in holdings),
+                     get_fx_snapshot(db).factors([inv.currency for inv in holdings], currency)))
+    base_value = {inv.id: float(inv.current_value or 0) * rates[inv.id] for inv in holdings}
+
+    by_class: dict[str, list[Investment]] = {asset_class: [] for asset_class in ASSET_CLASSES}
+    for inv in holdings:
+        by_class.setdefault(inv.asset_type, []).append(inv)
+    total = sum(base_value.values())
+
+    allocation, trades = [], []
+    for asset_class, items in by_class.items():
+        current = sum(base_value[inv.id] for inv in items)
+        target_pct = target.get(asset_class, 0.0) * 100
+        current_pct = current / total * 100 if total > 0 else 0.0
+        delta = total * target_pct / 100 - current
+        allocation.append({
+            "asset_class": asset_class,
+            "current_value": round(current, 2),
+            "current_percentage": round(current_pct, 2),
+            "target_percentage": round(target_pct, 2),
+            "drift": round(current_pct - target_pct, 2),
+        })
+        if abs(delta) < 0.01:
+            continue
+        if not items:
+            trades.append({"asset_class": asset_class, "symbol": None, "action": "buy",
+                           "amount": round(delta, 2), "units": None})
+            continue
+        for inv in items:
+            share = base_value[inv.id] / current if current > 0 else 1 / len(items)
+            amount = delta * share
+            price = float(inv.last_price or inv.avg_buy_price or 0) * rates[inv.id]
+            trades.append({
+                "asset_class": asset_class,
+                "symbol": inv.symbol,
+                "action": "buy" if amount > 0 else "sell",
+                "amount": round(abs(amount), 2),
+                "units": round(abs(amount) / price, 6) if price > 0 else None,
+            })
+
+    max_drift = max((abs(item["drift"]) for item in allocation), default=0.0)
+    return {
+        "risk_profile": user.risk_profile,
+        "currency": currency,
+        "total_value": round(total, 2),
+        "max_drift": max_drift,
+        "needs_rebalance": total > 0 and max_drift > threshold,
+        "allocation": allocation,
+        "trades": trades,
+    }
+
+
+def _user_chunks(db: Session, chunk_size: int) -> Iterator[list]:
+    """Keyset-paginate users so each batch holds at most `chunk_size` rows."""
+    last_id = 0
+    while True:
+        users = db.query(User.id, User.risk_profile).filter(User.id > last_id).order_by(User.id).limit(chunk_size).all()
+        if not users:
+            return
+        yield users
+        last_id = users[-1].id
+
+
+def drift_all_users(db: Session, threshold: float = DEFAULT_DRIFT_THRESHOLD, chunk_size: int = 10000) -> Iterator[dict]:
+    """Score allocation drift for every user, one chunk of users at a time.
+
+    Each chunk is one grouped aggregate over the investments table scattered
+    into a (users x asset classes) matrix and compared against the stacked
+    targets in a single vectorised step. Unknown asset classes land in an
+    extra zero-target column. Values are compared in USD, which leaves the
+    percentages independent of each user's base currency.
+    """
+    columns = {asset_class: i for i, asset_class in enumerate(ASSET_CLASSES)}
+    other = len(ASSET_CLASSES)
+    profile_targets = {
+        profile: np.array([weights.get(c, 0.0) for c in ASSET_CLASSES] + [0.0])
+        for profile, weights in TARGET_ALLOCATIONS.items()
+    }
+
+    snapshot = get_fx_snapshot(db)
+    for users in _user_chunks(db, chunk_size):
+        rows = {user.id: i for i, user in enumerate(users)}
+        values = np.zeros((len(users), other + 1))
+        targets = np.stack([profile_targets.get(u.risk_profile or "moderate", profile_targets["moderate"]) for u in users])
+
+        aggregates = db.query(
+            Investment.user_id, Investment.asset_type, Investment.currency, func.sum(Investment.current_value).label("value")
+        ).filter(Investment.user_id >= users[0].id, Investment.user_id <= users[-1].id).group_by(
+            Investment.user_id, Investment.asset_type, Investment.currency
+        ).all()
+        if aggregates:
+            usd = snapshot.convert_many([row.value or 0 for row in aggregates], [row.currency for row in aggregates], "USD")
+            user_idx = np.fromiter((rows[row.user_id] for row in aggregates), dtype=np.intp, count=len(aggregates))
+            col_idx = np.fromiter((columns.get(row.asset_type, other) for row in aggregates), dtype=np.intp,
+                                  count=len(aggregates))
+            np.add.at(values, (user_idx, col_idx), usd)
+
+        totals = values.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            current = np.where(totals[:, None] > 0, values / totals[:, None], 0.0)
+        drift = (current - targets) * 100
+        max_drift = np.where(totals > 0, np.abs(drift).max(axis=1), 0.0)
+
+        for i, user in enumerate(users):
+            yield {
+                "user_id": user.id,
+                "risk_profile": user.risk_profile,
+                "total_value": round(float(totals[i]), 2),
+                "max_drift": round(float(max_drift[i]), 2),
+                "needs_rebalance": bool(max_drift[i] > threshold),
+            }
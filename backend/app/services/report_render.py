@@ -0,0 +1,122 @@
+"""Render report documents to vector PDF or CSV.
+
+A report is a plain dict so it can be handed to a worker process:
+
+    {"title": str, "subtitle": str,
+     "summary": [(label, value), ...],
+     "sections": [{"title": str, "columns": [...], "rows": [[...], ...]}, ...],
+     "chart": {"title": str, "x_label": str, "series": {name: [(x, y), ...]}} | None}
+
+All values are already formatted plain-text strings (not markup).
+Renderers write to a temporary file and move it into place, so a reader
+never sees a partial document.
+"""
+
+import csv
+import os
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.legends import LineLegend
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+SERIES_COLORS = (colors.HexColor("#10b981"), colors.HexColor("#6366f1"), colors.HexColor("#f43f5e"))
+
+TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e293b")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f1f5f9")]),
+    ("LINEBELOW", (0, 0), (-1, 0), 0.5, colors.HexColor("#334155")),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+])
+
+
+def _chart(chart: dict, width: float) -> Drawing:
+    height = 70 * mm
+    drawing = Drawing(width, height)
+    plot = LinePlot()
+    plot.x, plot.y = 12 * mm, 15 * mm
+    plot.width, plot.height = width - 20 * mm, height - 28 * mm
+    plot.data = [list(points) for points in chart["series"].values()]
+    for i in range(len(plot.data)):
+        plot.lines[i].strokeColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+        plot.lines[i].strokeWidth = 1.5
+    for axis in (plot.xValueAxis, plot.yValueAxis):
+        axis.labels.fontName, axis.labels.fontSize = "Helvetica", 7
+    plot.yValueAxis.labelTextFormat = lambda v: f"{v / 1000:,.0f}k" if abs(v) >= 1000 else f"{v:,.0f}"
+    drawing.add(plot)
+
+    legend = LineLegend()
+    legend.x, legend.y = 12 * mm, height - 4 * mm
+    legend.fontName, legend.fontSize = "Helvetica", 7
+    legend.columnMaximum = 1
+    legend.alignment = "right"
+    legend.colorNamePairs = [(SERIES_COLORS[i % len(SERIES_COLORS)], name) for i, name in enumerate(chart["series"])]
+    drawing.add(legend)
+    drawing.add(String(width / 2, 2 * mm, chart.get("x_label", ""), fontName="Helvetica", fontSize=7, textAnchor="middle"))
+    return drawing
+
+
+def render_pdf(report: dict, path: str) -> str:
+    styles = getSampleStyleSheet()
+    tmp = path + ".tmp"
+    doc = SimpleDocTemplate(tmp, pagesize=A4, title=report["title"],
+                            leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm)
+    story = [Paragraph(escape(report["title"]), styles["Title"])]
+    if report.get("subtitle"):
+        story.append(Paragraph(escape(report["subtitle"]), styles["Normal"]))
+    story.append(Spacer(1, 6 * mm))
+
+    if report.get("summary"):
+        summary = Table([[label, value] for label, value in report["summary"]], hAlign="LEFT")
+        summary.setStyle(TableStyle([("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"), ("FONTSIZE", (0, 0), (-1, -1), 9)]))
+        story += [summary, Spacer(1, 6 * mm)]
+
+    if report.get("chart"):
+        story += [Paragraph(escape(report["chart"]["title"]), styles["Heading2"]), _chart(report["chart"], doc.width),
+                  Spacer(1, 4 * mm)]
+
+    for section in report["sections"]:
+        story.append(Paragraph(escape(section["title"]), styles["Heading2"]))
+        if section["rows"]:
+            table = LongTable([section["columns"]] + section["rows"], repeatRows=1, hAlign="LEFT")
+            table.setStyle(TABLE_STYLE)
+            story.append(table)
+        else:
+            story.append(Paragraph("No entries.", styles["Italic"]))
+        story.append(Spacer(1, 5 * mm))
+
+    doc.build(story)
+    os.replace(tmp, path)
+    return path
+
+
+def render_csv(report: dict, path: str) -> str:
+    """One CSV with a block per section, separated by blank lines."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([report["title"]])
+        for label, value in report.get("summary", ()):
+            writer.writerow([label, value])
+        for section in report["sections"]:
+            writer.writerow([])
+            writer.writerow([section["title"]])
+            writer.writerow(section["columns"])
+            writer.writerows(section["rows"])
+    os.replace(tmp, path)
+    return path
+
+
+RENDERERS = {"pdf": render_pdf, "csv": render_csv}
+
+
+def render(report: dict, fmt: str, path: str) -> str:
+    return RENDERERS[fmt](report, path)
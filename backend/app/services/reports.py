@@ -0,0 +1,238 @@
+"""Monthly and annual statements and goal simulations as downloadable files.
+
+Files are cached under REPORT_CACHE_DIR/<user_id>/<name>-<version>.<format>.
+The version is a digest of the user's data version (bumped by every change
+to their holdings, transactions, lots, goals or earmarks), the FX rates,
+today's date and the report parameters, so a cached statement is served
+without reading the user's data, while any change produces a new version.
+Only cache misses build the report content, which is then rendered in a
+spawned process pool so PDF layout never competes with request handling
+for the GIL; concurrent requests for the same file share one render.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.goal import Goal
+from app.models.investment import Investment
+from app.models.user import User
+from app.services.fx import convert_totals, get_fx_snapshot
+from app.services.report_render import RENDERERS, render
+from app.services.transaction_archive import user_transactions
+
+FORMATS = tuple(RENDERERS)
+DEFAULT_ANNUAL_RETURN = 7.0  # percent, matches the goal simulator's default
+VERSION_LENGTH = 16
+
+_pool: Optional[ProcessPoolExecutor] = None
+_in_flight: dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def _money(value) -> str:
+    return f"{Decimal(value or 0):,.2f}"
+
+
+def parse_period(period: str) -> tuple[datetime, datetime]:
+    """'YYYY-MM' for a monthly statement or 'YYYY' for an annual one."""
+    try:
+        if len(period) == 7:
+            start = datetime.strptime(period, "%Y-%m")
+            return start, datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+        if len(period) == 4:
+            start = datetime.strptime(period, "%Y")
+            return start, datetime(start.year + 1, 1, 1)
+    except ValueError:
+        pass
+    raise ValueError("period must be YYYY-MM or YYYY")
+
+
+def project_goal(start_amount: float, monthly_contribution: float, annual_return: float, months: int) -> list[float]:
+    """Balance at the start of each month 0..months, compounding monthly."""
+    rate = annual_return / 100 / 12
+    balances = [start_amount]
+    for _ in range(max(months, 0)):
+        balances.append(balances[-1] * (1 + rate) + monthly_contribution)
+    return balances
+
+
+def _months_until(target: date, today: Optional[date] = None) -> int:
+    today = today or date.today()
+    return max((target.year - today.year) * 12 + target.month - today.month, 0)
+
+
+def statement_report(db: Session, user: User, period: str, annual_return: float = DEFAULT_ANNUAL_RETURN) -> dict:
+    start, end = parse_period(period)
+    currency = user.base_currency or "USD"
+    holdings = db.query(Investment).filter(Investment.user_id == user.id).order_by(Investment.symbol).all()
+    goals = db.query(Goal).filter(Goal.user_id == user.id).order_by(Goal.target_date, Goal.id).all()
+    transactions = user_transactions(db, user.id, start, end)
+    snapshot = get_fx_snapshot(db)
+
+    invested, current, _ = convert_totals(
+        snapshot, [(h.asset_type, h.currency, h.cost_basis, h.current_value) for h in holdings], currency)
+
+    holding_rows = [
+        [h.symbol, h.asset_type, h.currency, f"{Decimal(h.units or 0):,.6f}".rstrip("0").rstrip("."),
+         _money(h.avg_buy_price), _money(h.cost_basis), _money(h.current_value),
+         _money(snapshot.convert(h.current_value, h.currency, currency))]
+        for h in holdings
+    ]
+    transaction_rows = [
+        [t.executed_at.strftime("%Y-%m-%d"), t.symbol, t.type, f"{Decimal(t.quantity or 0):,.6f}".rstrip("0").rstrip("."),
+         f"{Decimal(t.price or 0):,.4f}", _money(t.fees), getattr(t, "currency", None) or "USD"]
+        for t in sorted(transactions, key=lambda t: (t.executed_at, t.id))
+    ]
+    goal_rows = []
+    for g in goals:
+        projected = project_goal(float(g.funded_amount or 0), float(g.monthly_contribution or 0), annual_return,
+                                 _months_until(g.target_date))[-1]
+        goal_rows.append([g.goal_type, _money(g.target_amount), g.target_date.isoformat(), _money(g.funded_amount),
+                          _money(g.monthly_contribution), _money(projected),
+                          "Yes" if projected >= float(g.target_amount or 0) else "No"])
+
+    label = f"{start:%B %Y}" if len(period) == 7 else period
+    return {
+        "title": f"{'Monthly' if len(period) == 7 else 'Annual'} Statement - {label}",
+        "subtitle": f"{user.name} <{user.email}> | values in {currency}, FX rates as of {snapshot.as_of}",
+        "summary": [
+            ("Total invested", f"{_money(invested)} {currency}"),
+            ("Current value", f"{_money(current)} {currency}"),
+            ("Profit / loss", f"{_money(current - invested)} {currency}"),
+            ("Transactions in period", str(len(transaction_rows))),
+        ],
+        "sections": [
+            {"title": "Holdings", "columns": ["Symbol", "Type", "Ccy", "Units", "Avg price", "Cost basis", "Value",
+                                              f"Value ({currency})"], "rows": holding_rows},
+            {"title": "Transactions", "columns": ["Date", "Symbol", "Type", "Quantity", "Price", "Fees", "Ccy"],
+             "rows": transaction_rows},
+            {"title": f"Goal projections ({annual_return:g}% annual return)",
+             "columns": ["Goal", "Target", "Target date", "Funded", "Monthly", "Projected", "On track"],
+             "rows": goal_rows},
+        ],
+        "chart": None,
+    }
+
+
+def simulation_report(goal: Goal, target_amount: Optional[float] = None, monthly_contribution: Optional[float] = None,
+                      annual_return: float = DEFAULT_ANNUAL_RETURN, years: Optional[int] = None) -> dict:
+    target = float(goal.target_amount if target_amount is None else target_amount)
+    monthly = float(goal.monthly_contribution or 0) if monthly_contribution is None else monthly_contribution
+    months = years * 12 if years is not None else max(12, -(-_months_until(goal.target_date) // 12) * 12)
+    balances = project_goal(float(goal.funded_amount or 0), monthly, annual_return, months)
+    reached = next((m for m, balance in enumerate(balances) if balance >= target), None)
+
+    yearly = [(m // 12, balances[m]) for m in range(0, months + 1, 12)]
+    return {
+        "title": f"{goal.goal_type.title()} Simulation",
+        "subtitle": f"Target {_money(target)} by {goal.target_date.isoformat()}",
+        "summary": [
+            ("Starting amount", _money(goal.funded_amount)),
+            ("Monthly contribution", _money(monthly)),
+            ("Annual return", f"{annual_return:g}%"),
+            ("Projected final value", _money(balances[-1])),
+            ("Target reached", f"after {reached} months" if reached is not None else "not within the horizon"),
+        ],
+        "sections": [{"title": "Yearly projection", "columns": ["Year", "Projected", "Target"],
+                      "rows": [[str(year), _money(value), _money(target)] for year, value in yearly]}],
+        "chart": {"title": "Projected growth", "x_label": "Years",
+                  "series": {"Projected": [(float(y), round(v, 2)) for y, v in yearly],
+                             "Target": [(0.0, target), (float(yearly[-1][0]), target)]}},
+    }
+
+
+def data_version(key) -> str:
+    payload = json.dumps(key, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()[:VERSION_LENGTH]
+
+
+def report_version(db: Session, user: User, *params) -> str:
+    """Version of one of `user`'s reports, cheap enough to compute on every request."""
+    snapshot = get_fx_snapshot(db)
+    return data_version([user.data_version, snapshot.as_of, sorted(snapshot.rates.items()), date.today(), *params])
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Callers hold _lock.
+    global _pool
+    if _pool is None:
+        # Forking a threaded server can copy locks held by other threads into the child.
+        _pool = ProcessPoolExecutor(max_workers=get_settings().REPORT_WORKERS,
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_report_pool() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _prune(directory: str, name: str, fmt: str, keep: str) -> None:
+    """Drop superseded versions of one report once a newer one exists."""
+    # Exactly `{name}-{version}.{fmt}`: "statement-2024" must not match "statement-2024-03-<version>".
+    version = re.compile(rf"{re.escape(name)}-[0-9a-f]{{{VERSION_LENGTH}}}\.{re.escape(fmt)}")
+    for entry in os.listdir(directory):
+        if version.fullmatch(entry) and entry != keep:
+            try:
+                os.remove(os.path.join(directory, entry))
+            except FileNotFoundError:
+                pass
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def cached_report(user_id: int, name: str, version: str, build: Callable[[], dict], fmt: str,
+                  root: Optional[str] = None) -> bytes:
+    """Contents of report `version` rendered as `fmt`, calling `build` only if it is not on disk.
+
+    The bytes are read before returning, so pruning by a concurrent request
+    for a newer version cannot remove a file that is still being served.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    directory = os.path.join(root or get_settings().REPORT_CACHE_DIR, str(user_id))
+    filename = f"{name}-{version}.{fmt}"
+    path = os.path.join(directory, filename)
+    report = None
+    # A request for another version can prune this file between its render and
+    # our read; render it again in that case.
+    while True:
+        content = _read(path)
+        if content is not None:
+            return content
+        if report is None:
+            report = build()
+        os.makedirs(directory, exist_ok=True)
+        with _lock:
+            future = _in_flight.get(path)
+            owner = future is None
+            if owner:
+                future = _in_flight[path] = _get_pool().submit(render, report, fmt, path)
+        try:
+            future.result()
+        finally:
+            if owner:
+                with _lock:
+                    _in_flight.pop(path, None)
+        if owner:
+            _prune(directory, name, fmt, filename)
@@ -0,0 +1,231 @@
+"""Portfolio risk analytics: volatility, VaR and max drawdown.
+
+Return statistics are computed once per day over every symbol held on any
+shard and shared by all users (`RiskModel`), so scoring a portfolio reduces to
+projecting its weight vector through the shared returns and covariance.
+"""
+
+import threading
+from datetime import date, timedelta
+from statistics import NormalDist
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import shard_router
+from app.models.investment import Investment
+from app.models.user import User
+from app.services.fx import get_fx_snapshot
+from app.services.price_store import PriceStore, get_price_store
+
+TRADING_DAYS = 252
+LOOKBACK_DAYS = 365
+MIN_OBSERVATIONS = 20
+
+# Annualised volatility band considered appropriate for each risk profile.
+RISK_PROFILE_VOLATILITY = {
+    "conservative": (0.0, 0.10),
+    "moderate": (0.08, 0.18),
+    "aggressive": (0.15, float("inf")),
+}
+
+
+class RiskModel:
+    """Daily returns and covariance for a symbol universe."""
+
+    def __init__(self, as_of: date, symbols: list[str], returns: np.ndarray, missing: set[str]):
+        self.as_of = as_of
+        self.symbols = symbols
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.returns = returns
+        self.mean = returns.mean(axis=0) if len(returns) else np.zeros(len(symbols))
+        self.cov = np.cov(returns, rowvar=False).reshape(len(symbols), len(symbols)) if len(returns) > 1 \
+            else np.zeros((len(symbols), len(symbols)))
+        self.missing = missing
+
+    def covers(self, symbols) -> bool:
+        return all(s in self.index or s in self.missing for s in symbols)
+
+    @classmethod
+    def build(cls, store: PriceStore, symbols: list[str], as_of: date, lookback_days: int = LOOKBACK_DAYS) -> "RiskModel":
+        symbols = sorted(set(symbols))
+        _, closes = store.aligned(symbols, as_of - timedelta(days=lookback_days), as_of)
+        if len(closes) < 2:
+            return cls(as_of, [], np.empty((0, 0)), set(symbols))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = closes[1:] / closes[:-1] - 1.0
+        observed = np.isfinite(returns).sum(axis=0)
+        keep = observed >= MIN_OBSERVATIONS
+        kept = [s for s, k in zip(symbols, keep) if k]
+        missing = {s for s, k in zip(symbols, keep) if not k}
+        if not kept:
+            return cls(as_of, [], np.empty((0, 0)), missing)
+        # Days before a symbol's history starts count as flat.
+        returns = np.nan_to_num(returns[:, keep], nan=0.0, posinf=0.0, neginf=0.0)
+        return cls(as_of, kept, returns, missing)
+
+
+_model: Optional[RiskModel] = None
+_model_lock = threading.Lock()
+
+
+def held_symbols() -> set[str]:
+    """Every symbol held by any user, on every shard."""
+    symbols = set()
+    for engine in shard_router.engines().values():
+        with engine.connect() as conn:
+            symbols.update(conn.execute(select(Investment.symbol).distinct()).scalars())
+    return symbols
+
+
+def get_risk_model(symbols=(), store: Optional[PriceStore] = None) -> RiskModel:
+    """Shared model for today, rebuilt on a new day or when a held symbol is unknown to it.
+
+    The universe spans all shards, so users on different shards share one
+    model instead of each rebuilding it for their shard's symbols.
+    """
+    global _model
+    today = date.today()
+    model = _model
+    if model is not None and model.as_of == today and model.covers(symbols):
+        return model
+    with _model_lock:
+        if _model is None or _model.as_of != today or not _model.covers(symbols):
+            universe = held_symbols() | set(symbols)
+            _model = RiskModel.build(store or get_price_store(), list(universe), today)
+        return _model
+
+
+def _weight_matrix(model: RiskModel, holdings: list[tuple[int, str, float]], owners: list[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Scatter (owner, symbol, value) rows into a (owners x symbols) value matrix.
+
+    Returns the covered value matrix and each owner's total value (covered or not).
+    """
+    row_of = {owner: i for i, owner in enumerate(owners)}
+    values = np.zeros((len(owners), len(model.symbols)))
+    totals = np.zeros(len(owners))
+    for owner, symbol, value in holdings:
+        r = row_of[owner]
+        totals[r] += value
+        c = model.index.get(symbol)
+        if c is not None:
+            values[r, c] += value
+    return values, totals
+
+
+def score_portfolios(model: RiskModel, values: np.ndarray, confidence: float = 0.95) -> dict[str, np.ndarray]:
+    """Risk metrics for many portfolios at once.
+
+    `values` is (portfolios x symbols) in currency; metrics are computed on
+    the weights of the covered value and VaR is scaled back to currency.
+    """
+    covered = values.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.where(covered[:, None] > 0, values / covered[:, None], 0.0)
+
+    variance = np.einsum("ij,jk,ik->i", weights, model.cov, weights) if model.symbols else np.zeros(len(values))
+    vol_daily = np.sqrt(np.clip(variance, 0.0, None))
+    mean_daily = weights @ model.mean if model.symbols else np.zeros(len(values))
+
+    z = NormalDist().inv_cdf(confidence)
+    var_parametric = np.clip(z * vol_daily - mean_daily, 0.0, None) * covered
+
+    if len(model.returns) and model.symbols:
+        portfolio_returns = model.returns @ weights.T  # (days x portfolios)
+        var_historical = np.clip(-np.quantile(portfolio_returns, 1.0 - confidence, axis=0), 0.0, None) * covered
+        # Start every path at 1.0 so a loss on the first day counts as a drawdown.
+        growth = np.vstack([np.ones((1, len(values))), np.cumprod(1.0 + portfolio_returns, axis=0)])
+        peaks = np.maximum.accumulate(growth, axis=0)
+        max_drawdown = (1.0 - growth / peaks).max(axis=0)
+    else:
+        var_historical = np.zeros(len(values))
+        max_drawdown = np.zeros(len(values))
+
+    return {
+        "covered_value": covered,
+        "volatility_daily": vol_daily,
+        "volatility_annual": vol_daily * np.sqrt(TRADING_DAYS),
+        "var_historical": var_historical,
+        "var_parametric": var_parametric,
+        "max_drawdown": max_drawdown,
+    }
+
+
+def _common_currency_holdings(db: Session, rows, currency: str = "USD") -> list[tuple[int, str, float]]:
+    """(user_id, symbol, value) with every value converted into `currency`."""
+    rows = list(rows)
+    values = get_fx_snapshot(db).convert_many([row.current_value or 0 for row in rows],
+                                               [row.currency for row in rows], currency)
+    return [(row.user_id, row.symbol, float(value)) for row, value in zip(rows, values)]
+
+
+def portfolio_risk(db: Session, user_id: int, confidence: float = 0.95, currency: str = "USD") -> dict:
+    holdings = _common_currency_holdings(db, db.query(
+        Investment.user_id, Investment.symbol, Investment.current_value, Investment.currency
+    ).filter(Investment.user_id == user_id), currency)
+    model = get_risk_model([symbol for _, symbol, _ in holdings])
+    values, totals = _weight_matrix(model, holdings, [user_id])
+    metrics = score_portfolios(model, values, confidence)
+
+    return {
+        "as_of": model.as_of,
+        "currency": currency,
+        "confidence": confidence,
+        "portfolio_value": float(totals[0]),
+        "covered_value": float(metrics["covered_value"][0]),
+        "volatility_daily": float(metrics["volatility_daily"][0]),
+        "volatility_annual": float(metrics["volatility_annual"][0]),
+        "var_historical": float(metrics["var_historical"][0]),
+        "var_parametric": float(metrics["var_parametric"][0]),
+        "max_drawdown": float(metrics["max_drawdown"][0]),
+        "uncovered_symbols": sorted({s for _, s, _ in holdings if s not in model.index}),
+    }
+
+
+def profile_drift(risk_profile: Optional[str], volatility_annual: float) -> str:
+    low, high = RISK_PROFILE_VOLATILITY.get(risk_profile or "moderate", RISK_PROFILE_VOLATILITY["moderate"])
+    if volatility_annual > high:
+        return "above"
+    if volatility_annual < low:
+        return "below"
+    return "within"
+
+
+def score_all_users(db: Session, confidence: float = 0.95, chunk_size: int = 5000) -> list[dict]:
+    """Score every user's portfolio for the nightly drift report.
+
+    Users are scored a chunk at a time so the (days x users) return matrix
+    stays bounded however many users there are.
+    """
+    holdings_by_user: dict[int, list] = {}
+    symbols = set()
+    for holding in _common_currency_holdings(db, db.query(Investment.user_id, Investment.symbol,
+                                                          Investment.current_value, Investment.currency)):
+        holdings_by_user.setdefault(holding[0], []).append(holding)
+        symbols.add(holding[1])
+    users = db.query(User.id, User.risk_profile).order_by(User.id).all()
+    model = get_risk_model(symbols)
+
+    report = []
+    for start in range(0, len(users), chunk_size):
+        chunk = users[start:start + chunk_size]
+        holdings = [h for u in chunk for h in holdings_by_user.get(u.id, ())]
+        values, totals = _weight_matrix(model, holdings, [u.id for u in chunk])
+        metrics = score_portfolios(model, values, confidence)
+        for i, user in enumerate(chunk):
+            vol = float(metrics["volatility_annual"][i])
+            report.append({
+                "user_id": user.id,
+                "risk_profile": user.risk_profile,
+                "portfolio_value": float(totals[i]),
+                "covered_value": float(metrics["covered_value"][i]),
+                "volatility_annual": vol,
+                "var_historical": float(metrics["var_historical"][i]),
+                "var_parametric": float(metrics["var_parametric"][i]),
+                "max_drawdown": float(metrics["max_drawdown"][i]),
+                "drift": profile_drift(user.risk_profile, vol) if totals[i] > 0 else "empty",
+            })
+    return report
@@ -0,0 +1,34 @@
+"""Columns added to tables that existing databases already have.
+
+`create_all` only creates missing tables, so every column added to an
+existing model is listed here and added on startup where it is missing.
+Each entry is idempotent; new databases get the column from `create_all`.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# (table, column, column DDL). Only append; never edit a shipped entry.
+ADDED_COLUMNS = [
+    ("goals", "funded_amount", "NUMERIC(15, 2) NOT NULL DEFAULT 0"),
+    ("users", "base_currency", "VARCHAR(3) NOT NULL DEFAULT 'USD'"),
+    ("investments", "currency", "VARCHAR(3) NOT NULL DEFAULT 'USD'"),
+    ("transactions", "currency", "VARCHAR(3) NOT NULL DEFAULT 'USD'"),
+    ("tax_lots", "currency", "VARCHAR(3) NOT NULL DEFAULT 'USD'"),
+    ("lot_disposals", "currency", "VARCHAR(3) NOT NULL DEFAULT 'USD'"),
+    ("users", "data_version", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def upgrade_schema(engine: Engine) -> list[str]:
+    """Add any missing columns from ADDED_COLUMNS; returns "table.column" for each one added."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table, column, ddl in ADDED_COLUMNS:
+            if table not in tables or column in {c["name"] for c in inspector.get_columns(table)}:
+                continue
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            added.append(f"{table}.{column}")
+    return added
@@ -0,0 +1,199 @@
+"""Move users between shards, one bucket at a time.
+
+Moving a bucket from shard A to shard B:
+
+1. mark the bucket frozen in the shard map, then wait until every API
+   process has reloaded the map and finished in-flight requests; from then
+   on the bucket's users get 503 and nothing writes their rows
+2. copy their rows from A to B in one transaction on B
+3. assign the bucket to B and unfreeze it
+4. delete the rows from A
+
+User ids are global and copied as-is. Other row ids are per shard, so
+copied rows get new ids on B and references between them (foreign keys,
+plus the plain transaction/lot ids on tax lots and disposals) are
+rewritten. Archived transactions stay where they are: the archive is
+shared by all shards and keeps them under shard A's name and ids. Lots and
+disposals pointing at them lose that link on B, where the old id may
+belong to another transaction. Pending outbox events stay on A and are
+dispatched from there. `fx_rates` is reference data every shard keeps on its own.
+"""
+
+import time
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import Table, delete, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.ddl import sort_tables
+
+from app.core.sharding import ShardRouter
+from app.database import Base
+
+SKIPPED = {"fx_rates", "outbox_events"}
+# Id columns that point at another table without a foreign key.
+PLAIN_REFERENCES = {
+    ("tax_lots", "transaction_id"): "transactions",
+    ("lot_disposals", "transaction_id"): "transactions",
+}
+CHUNK_USERS = 500
+
+
+def user_tables() -> list[Table]:
+    """Tables holding per-user rows, parents before children."""
+    tables = {t.name: t for t in Base.metadata.tables.values() if t.name not in SKIPPED}
+    extra = [(tables[target], tables[name]) for (name, _), target in PLAIN_REFERENCES.items()]
+    return sort_tables(tables.values(), extra_dependencies=extra)
+
+
+def _user_key(table: Table):
+    return table.c.id if table.name == "users" else table.c.user_id
+
+
+def _references(table: Table) -> dict[str, str]:
+    refs = {fk.parent.name: fk.column.table.name for fk in table.foreign_keys if fk.column.table.name != "users"}
+    refs.update({column: target for (name, column), target in PLAIN_REFERENCES.items() if name == table.name})
+    return refs
+
+
+def _chunks(user_ids: list[int]) -> Iterable[list[int]]:
+    for i in range(0, len(user_ids), CHUNK_USERS):
+        yield user_ids[i:i + CHUNK_USERS]
+
+
+def _copy_chunk(src: Connection, dst: Connection, user_ids: list[int], counts: dict[str, int]) -> None:
+    id_maps: dict[str, dict[int, int]] = {}
+    for table in user_tables():
+        rows = [dict(r._mapping) for r in src.execute(
+            select(table).where(_user_key(table).in_(user_ids)).order_by(table.c.id))]
+        counts[table.name] = counts.get(table.name, 0) + len(rows)
+        if not rows:
+            continue
+        if table.name == "users":
+            dst.execute(insert(table), rows)
+            continue
+        refs = _references(table)
+        old_ids = []
+        for row in rows:
+            old_ids.append(row.pop("id"))
+            for column, target in refs.items():
+                # Only archived transactions are missing from the map.
+                if row[column] is not None:
+                    row[column] = id_maps.get(target, {}).get(row[column])
+        new_ids = dst.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).scalars().all()
+        id_maps[table.name] = dict(zip(old_ids, new_ids))
+
+
+def copy_users(src: Engine, dst: Engine, user_ids: Iterable[int]) -> dict[str, int]:
+    """Copy users and all their rows from `src` to `dst`; returns rows copied per table."""
+    counts: dict[str, int] = {}
+    with src.connect() as src_conn, dst.begin() as dst_conn:
+        for chunk in _chunks(sorted(user_ids)):
+            _copy_chunk(src_conn, dst_conn, chunk, counts)
+    return counts
+
+
+def delete_users(engine: Engine, user_ids: Iterable[int]) -> int:
+    """Delete users and all their rows from one shard; returns users deleted."""
+    deleted = 0
+    with engine.begin() as conn:
+        for chunk in _chunks(sorted(user_ids)):
+            for table in reversed(user_tables()):
+                result = conn.execute(delete(table).where(_user_key(table).in_(chunk)))
+            deleted += result.rowcount
+    return deleted
+
+
+def bucket_user_ids(engine: Engine, buckets: int, bucket: int) -> list[int]:
+    users = Base.metadata.tables["users"]
+    with engine.connect() as conn:
+        return list(conn.execute(select(users.c.id).where(users.c.id % buckets == bucket)).scalars())
+
+
+def bucket_counts(router: ShardRouter) -> dict[int, int]:
+    """Users per bucket, counted on the shard each bucket is assigned to."""
+    shard_map = router.map
+    users = Base.metadata.tables["users"]
+    counts = {bucket: 0 for bucket in range(shard_map.buckets)}
+    for shard, engine in router.engines().items():
+        bucket = users.c.id % shard_map.buckets
+        with engine.connect() as conn:
+            for b, n in conn.execute(select(bucket, func.count()).group_by(bucket)):
+                if shard_map.bucket_shards[b] == shard:
+                    counts[b] = n
+    return counts
+
+
+def remove_strays(router: ShardRouter) -> dict[str, int]:
+    """Delete users left on a shard their bucket is not assigned to (an interrupted move)."""
+    shard_map = router.map
+    removed = {}
+    for shard, engine in router.engines().items():
+        stray = []
+        for bucket, owner in enumerate(shard_map.bucket_shards):
+            if owner != shard and bucket not in shard_map.frozen:
+                stray += bucket_user_ids(engine, shard_map.buckets, bucket)
+        removed[shard] = delete_users(engine, stray) if stray else 0
+    return removed
+
+
+def move_bucket(router: ShardRouter, bucket: int, target: str, settle_seconds: Optional[float] = None,
+                log: Callable[[str], None] = print) -> dict[str, int]:
+    """Move every user in `bucket` to shard `target`; returns rows copied per table."""
+    if not router.map_path:
+        raise ValueError("Moving buckets needs a shard map file (SHARD_MAP_PATH)")
+    shard_map = router.reload()
+    if target not in shard_map.shards:
+        raise ValueError(f"Unknown shard {target}")
+    source = shard_map.bucket_shards[bucket]
+    if source == target:
+        return {}
+    src, dst = router.engine(source), router.engine(target)
+    if settle_seconds is None:
+        settle_seconds = router.reload_seconds + 5
+
+    shard_map.frozen.add(bucket)
+    shard_map.save(router.map_path)
+    log(f"Bucket {bucket} frozen; waiting {settle_seconds:g}s for API processes to pick it up...")
+    time.sleep(settle_seconds)
+    try:
+        user_ids = bucket_user_ids(src, shard_map.buckets, bucket)
+        # Leftovers from an earlier interrupted move of this bucket.
+        leftovers = bucket_user_ids(dst, shard_map.buckets, bucket)
+        if leftovers:
+            delete_users(dst, leftovers)
+        counts = copy_users(src, dst, user_ids)
+    except Exception:
+        shard_map.frozen.discard(bucket)
+        shard_map.save(router.map_path)
+        raise
+    shard_map.bucket_shards[bucket] = target
+    shard_map.frozen.discard(bucket)
+    shard_map.save(router.map_path)
+    router.reload()
+    log(f"Bucket {bucket}: {len(user_ids)} users now on {target}; removing them from {source}.")
+    delete_users(src, user_ids)
+    return counts
+
+
+def plan_rebalance(shard_loads: dict[str, dict[int, int]]) -> list[tuple[int, str, str]]:
+    """Greedy (bucket, source, target) moves evening out users per shard.
+
+    `shard_loads` maps every shard, including empty ones, to {bucket: users}.
+    With no users at all, buckets themselves are evened out instead.
+    """
+    if not any(n for buckets in shard_loads.values() for n in buckets.values()):
+        shard_loads = {shard: {b: 1 for b in buckets} for shard, buckets in shard_loads.items()}
+    loads = {shard: {b: n for b, n in buckets.items()} for shard, buckets in shard_loads.items()}
+    moves = []
+    while True:
+        totals = {shard: sum(buckets.values()) for shard, buckets in loads.items()}
+        heaviest = max(totals, key=totals.get)
+        lightest = min(totals, key=totals.get)
+        gap = totals[heaviest] - totals[lightest]
+        # Moving n users from heaviest to lightest helps while n < gap; closest to gap/2 helps most.
+        candidates = [(abs(gap / 2 - n), b) for b, n in loads[heaviest].items() if 0 < n < gap]
+        if not candidates:
+            return moves
+        _, bucket = min(candidates)
+        loads[lightest][bucket] = loads[heaviest].pop(bucket)
+        moves.append((bucket, heaviest, lightest))
@@ -0,0 +1,254 @@
+"""Tax lot accounting: lot queues, disposals and realised/unrealised gains."""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.investment import Investment
+from app.models.tax_lot import TaxLot, LotDisposal
+from app.services.fx import CENT, get_fx_snapshot
+
+LOT_METHODS = ("fifo", "lifo", "specific")
+LONG_TERM_HOLDING = timedelta(days=365)
+LOT_BATCH = 32
+
+LotSlice = namedtuple("LotSlice", ["lot", "quantity", "unit_cost", "acquired_at"])
+
+
+def open_lot(db: Session, user_id: int, symbol: str, quantity: Decimal, unit_cost: Decimal,
+             acquired_at: Optional[datetime] = None, transaction_id: Optional[int] = None,
+             currency: str = "USD") -> TaxLot:
+    lot = TaxLot(user_id=user_id, transaction_id=transaction_id, symbol=symbol, quantity=quantity,
+                 remaining_quantity=quantity, unit_cost=unit_cost, currency=currency,
+                 acquired_at=acquired_at or datetime.utcnow())
+    db.add(lot)
+    return lot
+
+
+def _open_lots(db: Session, user_id: int, symbol: str):
+    return db.query(TaxLot).filter(TaxLot.user_id == user_id, TaxLot.symbol == symbol, TaxLot.remaining_quantity > 0)
+
+
+def _ordered_lots(db: Session, user_id: int, symbol: str, method: str) -> Iterator[TaxLot]:
+    """Open lots in FIFO or LIFO order, fetched a batch at a time.
+
+    A sell that closes k lots reads about k rows instead of every open lot
+    for the symbol.
+    """
+    if method == "fifo":
+        order = (TaxLot.acquired_at, TaxLot.id)
+    else:
+        order = (TaxLot.acquired_at.desc(), TaxLot.id.desc())
+    query = _open_lots(db, user_id, symbol).order_by(*order).limit(LOT_BATCH)
+    offset = 0
+    while True:
+        # No autoflush, so lots consumed from earlier batches keep their place in the paging.
+        with db.no_autoflush:
+            batch = query.offset(offset).all()
+        yield from batch
+        if len(batch) < LOT_BATCH:
+            return
+        offset += LOT_BATCH
+
+
+def _selected_lots(db: Session, user_id: int, symbol: str, lot_ids: list[int]) -> list[TaxLot]:
+    if not lot_ids:
+        raise ValueError("Specific lot selection requires lot_ids")
+    by_id = {lot.id: lot for lot in _open_lots(db, user_id, symbol).filter(TaxLot.id.in_(lot_ids))}
+    for lot_id in lot_ids:
+        if lot_id not in by_id:
+            raise ValueError(f"Lot {lot_id} is not an open lot for this symbol")
+    return [by_id[lot_id] for lot_id in lot_ids]
+
+
+def _consume(lots: Iterable[TaxLot], quantity: Decimal) -> tuple[list[LotSlice], Decimal]:
+    """Take `quantity` units from `lots` in order, updating their remaining quantity."""
+    slices = []
+    remaining = Decimal(quantity)
+    for lot in lots:
+        if remaining <= 0:
+            break
+        taken = min(Decimal(lot.remaining_quantity), remaining)
+        if taken <= 0:
+            continue
+        lot.remaining_quantity = lot.remaining_quantity - taken
+        slices.append(LotSlice(lot, taken, Decimal(lot.unit_cost), lot.acquired_at))
+        remaining -= taken
+    return slices, remaining
+
+
+def dispose_lots(db: Session, user_id: int, symbol: str, quantity: Decimal, price: Decimal,
+                 method: str = "fifo", lot_ids: Optional[list[int]] = None, held_units: Optional[Decimal] = None,
+                 fallback_unit_cost: Optional[Decimal] = None, disposed_at: Optional[datetime] = None,
+                 transaction_id: Optional[int] = None, currency: str = "USD") -> list[LotDisposal]:
+    """Consume lots for a sell and record one disposal per lot touched.
+
+    Quantity not covered by tracked lots (holdings that predate lot tracking)
+    is recorded against `fallback_unit_cost` with no lot or acquisition date,
+    as long as the holding's `held_units` cover the whole sell. Anything more
+    raises ValueError. Specific-ID sells must be fully covered by the
+    selected lots.
+    """
+    if method not in LOT_METHODS:
+        raise ValueError(f"Unknown lot method '{method}'")
+    disposed_at = disposed_at or datetime.utcnow()
+    if method == "specific":
+        slices, uncovered = _consume(_selected_lots(db, user_id, symbol, lot_ids or []), quantity)
+        if uncovered > 0:
+            raise ValueError(f"Selected lots are short by {uncovered} units")
+    else:
+        slices, uncovered = _consume(_ordered_lots(db, user_id, symbol, method), quantity)
+        if uncovered > 0 and (held_units is None or fallback_unit_cost is None or quantity > held_units):
+            available = max(Decimal(held_units or 0), Decimal(quantity) - uncovered)
+            raise ValueError(f"Cannot sell {quantity} {symbol}: only {available} units are held")
+
+    disposals = []
+    for piece in slices:
+        lot = piece.lot
+        if lot.remaining_quantity <= 0:
+            lot.closed_at = disposed_at
+        disposals.append(LotDisposal(user_id=user_id, lot_id=lot.id, transaction_id=transaction_id, symbol=symbol,
+                                     quantity=piece.quantity, unit_cost=piece.unit_cost, unit_proceeds=price,
+                                     currency=currency, acquired_at=piece.acquired_at, disposed_at=disposed_at))
+    if uncovered > 0:
+        disposals.append(LotDisposal(user_id=user_id, lot_id=None, transaction_id=transaction_id, symbol=symbol,
+                                     quantity=uncovered, unit_cost=fallback_unit_cost,
+                                     unit_proceeds=price, currency=currency, acquired_at=None, disposed_at=disposed_at))
+    db.add_all(disposals)
+    return disposals
+
+
+def has_lot_records(db: Session, user_id: int, transaction_id: int) -> bool:
+    """Whether a transaction opened a lot or disposed of one."""
+    return (db.query(TaxLot.id).filter(TaxLot.user_id == user_id, TaxLot.transaction_id == transaction_id).first() is not None
+            or db.query(LotDisposal.id).filter(LotDisposal.user_id == user_id,
+                                               LotDisposal.transaction_id == transaction_id).first() is not None)
+
+
+def reverse_transaction_lots(db: Session, user_id: int, transaction_id: int) -> None:
+    """Undo a transaction's lot records before the transaction is deleted.
+
+    A sell's disposals go back into the lots they came from. A buy's lot is
+    removed, unless some of it has already been sold (ValueError).
+    """
+    disposals = db.query(LotDisposal).filter(LotDisposal.user_id == user_id,
+                                             LotDisposal.transaction_id == transaction_id).all()
+    lot_ids = {d.lot_id for d in disposals if d.lot_id is not None}
+    lots = {lot.id: lot for lot in db.query(TaxLot).filter(TaxLot.id.in_(lot_ids))} if lot_ids else {}
+    for d in disposals:
+        lot = lots.get(d.lot_id)
+        if lot is not None:
+            lot.remaining_quantity = lot.remaining_quantity + d.quantity
+            lot.closed_at = None
+        db.delete(d)
+
+    for lot in db.query(TaxLot).filter(TaxLot.user_id == user_id, TaxLot.transaction_id == transaction_id):
+        if lot.remaining_quantity != lot.quantity:
+            raise ValueError("Units from this buy have already been sold; delete those sells first")
+        db.delete(lot)
+
+
+def reset_open_lots(db: Session, user_id: int, symbol: str, units: Decimal, unit_cost: Decimal,
+                    currency: str = "USD") -> Optional[TaxLot]:
+    """Replace the open lots for (user, symbol) with one lot matching a directly edited holding.
+
+    Untouched lots are deleted and partly sold ones shrink to what was sold,
+    so realised gains are unchanged. The new lot keeps the earliest
+    acquisition date of the lots it replaces.
+    """
+    now = datetime.utcnow()
+    acquired_at = None
+    for lot in _open_lots(db, user_id, symbol).all():
+        if lot.acquired_at is not None and (acquired_at is None or lot.acquired_at < acquired_at):
+            acquired_at = lot.acquired_at
+        if lot.remaining_quantity == lot.quantity:
+            db.delete(lot)
+        else:
+            lot.quantity = lot.quantity - lot.remaining_quantity
+            lot.remaining_quantity = 0
+            lot.closed_at = now
+    if units > 0:
+        return open_lot(db, user_id, symbol, units, unit_cost, acquired_at=acquired_at or now, currency=currency)
+    return None
+
+
+def holding_term(acquired_at: Optional[datetime], disposed_at: datetime) -> str:
+    if acquired_at is None:
+        return "unknown"
+    return "long" if disposed_at - acquired_at > LONG_TERM_HOLDING else "short"
+
+
+def compute_gains(db: Session, user_id: int, tax_year: int, currency: str = "USD") -> dict:
+    """Realised gains for `tax_year` and unrealised gains on open lots.
+
+    Runs two queries regardless of how many sells the user made: all
+    disposals dated in the year, and all open lots joined to their holding's
+    last price. Everything else is a single pass in memory. Line items stay
+    in their holding's currency; totals are converted to `currency` at
+    current FX rates.
+    """
+    snapshot = get_fx_snapshot(db)
+    year_start = datetime(tax_year, 1, 1)
+    year_end = datetime(tax_year + 1, 1, 1)
+
+    disposals = db.query(LotDisposal).filter(
+        LotDisposal.user_id == user_id,
+        LotDisposal.disposed_at >= year_start,
+        LotDisposal.disposed_at < year_end,
+    ).order_by(LotDisposal.disposed_at, LotDisposal.id).all()
+
+    realised = []
+    totals = {"short": Decimal(0), "long": Decimal(0), "unknown": Decimal(0)}
+    for d in disposals:
+        cost_basis = d.quantity * d.unit_cost
+        proceeds = d.quantity * d.unit_proceeds
+        term = holding_term(d.acquired_at, d.disposed_at)
+        totals[term] += snapshot.convert(proceeds - cost_basis, d.currency or "USD", currency)
+        realised.append({
+            "symbol": d.symbol,
+            "currency": d.currency or "USD",
+            "lot_id": d.lot_id,
+            "quantity": d.quantity,
+            "acquired_at": d.acquired_at,
+            "disposed_at": d.disposed_at,
+            "cost_basis": cost_basis,
+            "proceeds": proceeds,
+            "gain": proceeds - cost_basis,
+            "term": term,
+        })
+
+    open_rows = db.query(TaxLot.symbol, TaxLot.currency, TaxLot.remaining_quantity, TaxLot.unit_cost,
+                         Investment.last_price).outerjoin(
+        Investment, (Investment.user_id == TaxLot.user_id) & (Investment.symbol == TaxLot.symbol)
+    ).filter(TaxLot.user_id == user_id, TaxLot.remaining_quantity > 0).all()
+
+    by_symbol: dict[tuple, dict] = {}
+    for row in open_rows:
+        lot_currency = row.currency or "USD"
+        item = by_symbol.setdefault((row.symbol, lot_currency), {
+            "symbol": row.symbol, "currency": lot_currency, "quantity": Decimal(0), "cost_basis": Decimal(0),
+            "market_value": Decimal(0),
+        })
+        price = row.last_price if row.last_price is not None else row.unit_cost
+        item["quantity"] += row.remaining_quantity
+        item["cost_basis"] += row.remaining_quantity * row.unit_cost
+        item["market_value"] += row.remaining_quantity * price
+    unrealised = []
+    for item in by_symbol.values():
+        item["gain"] = item["market_value"] - item["cost_basis"]
+        unrealised.append(item)
+
+    return {
+        "tax_year": tax_year,
+        "currency": currency,
+        "realised_total": sum(totals.values(), Decimal(0)).quantize(CENT),
+        "short_term_total": totals["short"].quantize(CENT),
+        "long_term_total": totals["long"].quantize(CENT),
+        "unrealised_total": sum((snapshot.convert(item["gain"], item["currency"], currency) for item in unrealised),
+                                Decimal(0)).quantize(CENT),
+        "realised": realised,
+        "unrealised": unrealised,
+    }
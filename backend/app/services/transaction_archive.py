@@ -0,0 +1,215 @@
+"""Cold transaction history stored as compressed columnar files.
+
+Each archived month is split by user bucket (user_id % BUCKETS) into
+`transactions_YYYY_MM_bNN.npz` files, so reading one user's history only
+opens their bucket's files. A file has a column per field, rows sorted by
+(user_id, executed_at) so one user's rows are a contiguous slice found by
+binary search. Month files written before the split are still read, and
+are folded into bucket files the next time that month is archived. Numeric fields are stored as
+fixed-point integers at the column's database scale so values round-trip
+exactly.
+
+All shards archive into the same files. Transaction ids are only unique
+within a shard, and a user moved to another shard gets new ids there, so
+archived rows are identified by (shard, user_id, id).
+"""
+
+import os
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.sharding import DEFAULT_SHARD
+from app.models.transaction import Transaction
+
+FIELDS = ("shard", "id", "user_id", "symbol", "type", "quantity", "price", "fees", "currency", "executed_at")
+SCALES = {"quantity": 6, "price": 4, "fees": 2}
+BUCKETS = 64
+_FILE_PATTERN = re.compile(r"^transactions_(\d{4})_(\d{2})(?:_b\d+)?\.npz$")
+
+ArchivedTransaction = namedtuple("ArchivedTransaction", FIELDS)
+
+
+def archive_dir() -> str:
+    return get_settings().TRANSACTION_ARCHIVE_DIR
+
+
+def bucket_of(user_id: int) -> int:
+    return user_id % BUCKETS
+
+
+def month_path(year: int, month: int, root: Optional[str] = None, bucket: Optional[int] = None) -> str:
+    """Path of one bucket's file for a month, or of the month's unsplit file with no bucket."""
+    suffix = f"_b{bucket:02d}" if bucket is not None else ""
+    return os.path.join(root or archive_dir(), f"transactions_{year:04d}_{month:02d}{suffix}.npz")
+
+
+def archived_months(root: Optional[str] = None) -> list[tuple[int, int]]:
+    root = root or archive_dir()
+    if not os.path.isdir(root):
+        return []
+    months = set()
+    for name in os.listdir(root):
+        match = _FILE_PATTERN.match(name)
+        if match:
+            months.add((int(match.group(1)), int(match.group(2))))
+    return sorted(months)
+
+
+def _to_columns(rows: Iterable) -> dict[str, np.ndarray]:
+    rows = sorted(rows, key=lambda r: (r.user_id, r.executed_at, r.shard, r.id))
+    columns = {
+        "shard": np.array([r.shard for r in rows], dtype=str),
+        "id": np.array([r.id for r in rows], dtype=np.int64),
+        "user_id": np.array([r.user_id for r in rows], dtype=np.int64),
+        "symbol": np.array([r.symbol for r in rows], dtype=str),
+        "type": np.array([r.type for r in rows], dtype=str),
+        "currency": np.array([getattr(r, "currency", None) or "USD" for r in rows], dtype=str),
+        "executed_at": np.array([r.executed_at for r in rows], dtype="datetime64[us]"),
+    }
+    for field, scale in SCALES.items():
+        columns[field] = np.array([int(Decimal(getattr(r, field) or 0).scaleb(scale).to_integral_value()) for r in rows], dtype=np.int64)
+    return columns
+
+
+def _key(row) -> tuple[str, int, int]:
+    return row.shard, row.user_id, row.id
+
+
+def _write(path: str, rows: Iterable) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, **_to_columns(rows))
+    os.replace(tmp, path)
+
+
+def write_month(year: int, month: int, rows: list, root: Optional[str] = None, shard: str = DEFAULT_SHARD) -> list[str]:
+    """Write (or extend) one month's bucket files atomically with `rows` from `shard`.
+
+    Rows of an unsplit file for the month are moved into the bucket files,
+    and the unsplit file is removed once they are all written.
+    """
+    unsplit = month_path(year, month, root)
+    os.makedirs(os.path.dirname(unsplit), exist_ok=True)
+    rows = [ArchivedTransaction(shard=shard, **{f: getattr(r, f) for f in FIELDS if f != "shard"}) for r in rows]
+    if os.path.exists(unsplit):
+        rows = _read_rows(unsplit) + rows
+    by_bucket: dict[int, list] = {}
+    for row in rows:
+        by_bucket.setdefault(bucket_of(row.user_id), []).append(row)
+
+    paths = []
+    for bucket, bucket_rows in sorted(by_bucket.items()):
+        path = month_path(year, month, root, bucket)
+        merged = {_key(r): r for r in _read_rows(path)} if os.path.exists(path) else {}
+        merged.update((_key(r), r) for r in bucket_rows)
+        _write(path, merged.values())
+        paths.append(path)
+    if os.path.exists(unsplit):
+        os.remove(unsplit)
+    return paths
+
+
+@lru_cache(maxsize=256)
+def _load(path: str, mtime: float) -> dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        columns = {field: data[field] for field in FIELDS if field in data.files}
+    # Files archived before multi-currency support hold USD rows only, and
+    # files archived before sharding hold rows of the single default shard.
+    columns.setdefault("currency", np.full(len(columns["id"]), "USD"))
+    columns.setdefault("shard", np.full(len(columns["id"]), DEFAULT_SHARD))
+    return columns
+
+
+def _columns(path: str) -> dict[str, np.ndarray]:
+    return _load(path, os.path.getmtime(path))
+
+
+def _rows(columns: dict[str, np.ndarray], lo: int, hi: int) -> list[ArchivedTransaction]:
+    out = []
+    for i in range(lo, hi):
+        out.append(ArchivedTransaction(
+            shard=str(columns["shard"][i]),
+            id=int(columns["id"][i]),
+            user_id=int(columns["user_id"][i]),
+            symbol=str(columns["symbol"][i]),
+            type=str(columns["type"][i]),
+            quantity=Decimal(int(columns["quantity"][i])).scaleb(-SCALES["quantity"]),
+            price=Decimal(int(columns["price"][i])).scaleb(-SCALES["price"]),
+            fees=Decimal(int(columns["fees"][i])).scaleb(-SCALES["fees"]),
+            currency=str(columns["currency"][i]),
+            executed_at=columns["executed_at"][i].astype(datetime),
+        ))
+    return out
+
+
+def _read_rows(path: str) -> list[ArchivedTransaction]:
+    columns = _columns(path)
+    return _rows(columns, 0, len(columns["id"]))
+
+
+def archived_transactions(user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          root: Optional[str] = None) -> list[ArchivedTransaction]:
+    """A user's archived transactions with start <= executed_at < end, newest first.
+
+    Only month files overlapping the range are opened. Archived rows are
+    read-only; they no longer exist in the database.
+    """
+    result = []
+    for year, month in archived_months(root):
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if (end is not None and month_start >= end) or (start is not None and month_end <= start):
+            continue
+        for path in (month_path(year, month, root, bucket_of(user_id)), month_path(year, month, root)):
+            if not os.path.exists(path):
+                continue
+            columns = _columns(path)
+            lo, hi = np.searchsorted(columns["user_id"], [user_id, user_id + 1])
+            if start is not None or end is not None:
+                executed = columns["executed_at"][lo:hi]
+                if start is not None:
+                    lo += np.searchsorted(executed, np.datetime64(start, "us"), side="left")
+                    executed = columns["executed_at"][lo:hi]
+                if end is not None:
+                    hi = lo + np.searchsorted(executed, np.datetime64(end, "us"), side="left")
+            result.extend(_rows(columns, int(lo), int(hi)))
+    result.sort(key=lambda r: (r.executed_at, r.id), reverse=True)
+    return result
+
+
+def user_transactions(db: Session, user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      limit: Optional[int] = None) -> list:
+    """A user's transactions from the database and the archive, newest first.
+
+    Bounding executed_at lets a partitioned table scan only the months in
+    range. Archived rows are merged back in only for an explicit `start`:
+    without one the listing covers the database's hot months, so an
+    unbounded request never reads the archive. They are also skipped when
+    `limit` is already met by recent rows.
+    """
+    query = db.query(Transaction).filter(Transaction.user_id == user_id)
+    if start is not None:
+        query = query.filter(Transaction.executed_at >= start)
+    if end is not None:
+        query = query.filter(Transaction.executed_at < end)
+    query = query.order_by(Transaction.executed_at.desc())
+    transactions = query.limit(limit).all() if limit else query.all()
+    if start is None or (limit and len(transactions) >= limit):
+        return transactions
+    # An interrupted archive run can leave rows both archived and in the
+    # database; the database copy wins.
+    shard = db.info.get("shard", DEFAULT_SHARD)
+    hot = {(shard, t.user_id, t.id) for t in transactions}
+    archived = [r for r in archived_transactions(user_id, start, end) if _key(r) not in hot]
+    if archived:
+        transactions = sorted(transactions + archived, key=lambda t: t.executed_at, reverse=True)
+    return transactions[:limit] if limit else transactions
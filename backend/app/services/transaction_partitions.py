@@ -0,0 +1,188 @@
+"""Monthly range partitioning of `transactions` and cold-history archival.
+
+On Postgres, `migrate_to_partitioned` rebuilds `transactions` as a table
+partitioned by RANGE (executed_at) with one partition per month plus a
+default partition. The ORM model is unchanged: ids still come from the
+same sequence, but the physical primary key becomes (id, executed_at) as
+Postgres requires, so foreign keys into `transactions` are dropped.
+
+`archive_before` moves whole months older than a cutoff into the columnar
+archive (see transaction_archive); on Postgres the month's partition is
+detached and dropped, elsewhere its rows are deleted.
+"""
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Engine
+
+from app.core.sharding import DEFAULT_SHARD
+from app.models.transaction import Transaction
+from app.services.transaction_archive import write_month
+
+PARENT = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+
+
+def _month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"transactions_p{month.year:04d}{month.month:02d}"
+
+
+def is_postgres(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def is_partitioned(engine: Engine) -> bool:
+    if not is_postgres(engine):
+        return False
+    with engine.connect() as conn:
+        kind = conn.execute(text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+                            {"name": PARENT}).scalar()
+    return kind == "p"
+
+
+def month_partitions(conn) -> list[date]:
+    """Months that currently have their own partition, oldest first."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": PARENT}).scalars()
+    months = []
+    for name in names:
+        if name.startswith("transactions_p") and name[len("transactions_p"):].isdigit():
+            suffix = name[len("transactions_p"):]
+            months.append(date(int(suffix[:4]), int(suffix[4:]), 1))
+    return sorted(months)
+
+
+def _create_partition(conn, parent: str, month: date) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    ))
+
+
+def ensure_partitions(engine: Engine, months_ahead: int = 3) -> list[date]:
+    """Create monthly partitions through `months_ahead` months from now.
+
+    Run ahead of time (e.g. nightly) so new rows never land in the default
+    partition, which would block creating their month's partition later.
+    """
+    created = []
+    with engine.begin() as conn:
+        existing = set(month_partitions(conn))
+        month = _month_start(datetime.utcnow())
+        for _ in range(months_ahead + 1):
+            if month not in existing:
+                _create_partition(conn, PARENT, month)
+                created.append(month)
+            month = _next_month(month)
+    return created
+
+
+def migrate_to_partitioned(engine: Engine, months_ahead: int = 3) -> int:
+    """Rebuild `transactions` as a monthly partitioned table; returns rows copied.
+
+    The table is locked for the whole rebuild, so writers wait until it is done.
+    """
+    if not is_postgres(engine):
+        raise RuntimeError("Partitioning is only supported on PostgreSQL")
+    if is_partitioned(engine):
+        return 0
+
+    staging = "transactions_partitioned"
+    with engine.begin() as conn:
+        # Block writes until the swap commits; rows inserted during the copy would be dropped with the old table.
+        conn.execute(text(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE"))
+        bounds = conn.execute(text(f"SELECT MIN(executed_at), COUNT(*) FROM {PARENT}")).one()
+        conn.execute(text(f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY NONE"))
+        conn.execute(text(f"""
+            CREATE TABLE {staging} (
+                id INTEGER NOT NULL DEFAULT nextval('{PARENT}_id_seq'),
+                user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                symbol VARCHAR(50) NOT NULL,
+                type VARCHAR(50) NOT NULL,
+                quantity NUMERIC(15, 6) NOT NULL,
+                price NUMERIC(15, 4) NOT NULL,
+                fees NUMERIC(15, 2) DEFAULT 0,
+                currency VARCHAR(3) NOT NULL DEFAULT 'USD',
+                executed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+                CONSTRAINT {staging}_pkey PRIMARY KEY (id, executed_at)
+            ) PARTITION BY RANGE (executed_at)
+        """))
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {staging} DEFAULT"))
+
+        month = _month_start(bounds[0] or datetime.utcnow())
+        last = _add_months(_month_start(datetime.utcnow()), months_ahead)
+        while month <= last:
+            _create_partition(conn, staging, month)
+            month = _next_month(month)
+
+        conn.execute(text(
+            f"INSERT INTO {staging} (id, user_id, symbol, type, quantity, price, fees, currency, executed_at) "
+            f"SELECT id, user_id, symbol, type, quantity, price, fees, currency, COALESCE(executed_at, now() AT TIME ZONE 'utc') "
+            f"FROM {PARENT}"
+        ))
+        # CASCADE drops the foreign keys other tables hold on the old table.
+        conn.execute(text(f"DROP TABLE {PARENT} CASCADE"))
+        conn.execute(text(f"ALTER TABLE {staging} RENAME TO {PARENT}"))
+        conn.execute(text(f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY {PARENT}.id"))
+        conn.execute(text(f"CREATE INDEX ix_transactions_user_executed ON {PARENT} (user_id, executed_at DESC)"))
+    return bounds[1]
+
+
+def _archive_month(engine: Engine, month: date, root: Optional[str], shard: str) -> int:
+    table = Transaction.__table__
+    lo = datetime.combine(month, datetime.min.time())
+    hi = datetime.combine(_next_month(month), datetime.min.time())
+    in_month = (table.c.executed_at >= lo) & (table.c.executed_at < hi)
+    with engine.begin() as conn:
+        # The range predicate lets Postgres prune the scan to this month's partition.
+        rows = conn.execute(select(table).where(in_month)).all()
+        if rows:
+            write_month(month.year, month.month, rows, root, shard)
+        if is_postgres(engine) and month in month_partitions(conn):
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {partition_name(month)}"))
+            conn.execute(text(f"DROP TABLE {partition_name(month)}"))
+        else:
+            conn.execute(delete(table).where(in_month))
+    return len(rows)
+
+
+def archive_before(engine: Engine, cutoff: date, root: Optional[str] = None, shard: str = DEFAULT_SHARD) -> list[date]:
+    """Archive every whole month before `cutoff`'s month from `shard`; returns the months moved.
+
+    Each month's file is written before its rows leave the database, so an
+    interrupted run only ever leaves rows in both places, never neither.
+    """
+    cutoff = _month_start(cutoff)
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(Transaction.__table__.c.executed_at))).scalar()
+        partitioned = [m for m in month_partitions(conn) if m < cutoff] if is_partitioned(engine) else []
+    months = set(partitioned)
+    if oldest is not None:
+        month = _month_start(oldest)
+        while month < cutoff:
+            months.add(month)
+            month = _next_month(month)
+
+    archived = []
+    for month in sorted(months):
+        if _archive_month(engine, month, root, shard) or month in partitioned:
+            archived.append(month)
+    return archived
@@ -0,0 +1,63 @@
+"""Global user ids and email lookup in the directory database.
+
+A user's id decides their shard, so ids are allocated here before the
+user row is written to that shard. Login resolves email -> id here and
+then reads the user from their shard.
+"""
+
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.user_directory import UserDirectory
+
+
+def lookup_user_id(db: Session, email: str) -> Optional[int]:
+    return db.query(UserDirectory.user_id).filter(UserDirectory.email == email).scalar()
+
+
+def allocate_user_id(db: Session, email: str) -> int:
+    """Reserve a global user id for `email`; raises ValueError if it is taken."""
+    entry = UserDirectory(email=email)
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("Email already registered")
+    return entry.user_id
+
+
+def release_user_id(db: Session, user_id: int) -> None:
+    """Undo `allocate_user_id` when the shard write fails."""
+    db.query(UserDirectory).filter(UserDirectory.user_id == user_id).delete()
+    db.commit()
+
+
+def sync_directory(directory_engine: Engine, shard_engines: dict[str, Engine]) -> int:
+    """Backfill an empty directory from the users already on the shards.
+
+    Runs on startup so a database created before sharding keeps its user
+    ids. Returns how many users were added.
+    """
+    table = UserDirectory.__table__
+    with directory_engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(table)).scalar():
+            return 0
+        added = 0
+        for shard_engine in shard_engines.values():
+            with shard_engine.connect() as shard_conn:
+                rows = [{"user_id": r.id, "email": r.email, "created_at": r.created_at}
+                        for r in shard_conn.execute(select(User.id, User.email, User.created_at))]
+            if rows:
+                conn.execute(table.insert(), rows)
+                added += len(rows)
+        if added and directory_engine.dialect.name == "postgresql":
+            # Explicit ids don't advance the serial sequence.
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('user_directory', 'user_id'), "
+                              "(SELECT MAX(user_id) FROM user_directory))"))
+        return added
@@ -0,0 +1,43 @@
+"""Per-user data version for caches keyed on a user's data.
+
+Every flush that creates, changes or deletes a user's rows bumps
+`users.data_version` in the same transaction, so a cache can tell whether
+anything changed with a primary-key read instead of re-reading the data.
+Changes made with bulk `query.update()`/`delete()` or plain SQL are not
+counted.
+"""
+
+from itertools import chain
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.models.goal import Goal
+from app.models.goal_earmark import GoalEarmark
+from app.models.investment import Investment
+from app.models.tax_lot import LotDisposal, TaxLot
+from app.models.transaction import Transaction
+from app.models.user import User
+
+VERSIONED = (Goal, GoalEarmark, Investment, Transaction, TaxLot, LotDisposal)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_versions(session: Session, flush_context) -> None:
+    user_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, VERSIONED):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, User) and obj not in session.new:
+            user_ids.add(obj.id)
+    user_ids.discard(None)
+    if not user_ids:
+        return
+    users = User.__table__
+    session.connection().execute(update(users).where(users.c.id.in_(user_ids))
+                                 .values(data_version=users.c.data_version + 1))
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, User) and obj.id in user_ids:
+            session.expire(obj, ["data_version"])
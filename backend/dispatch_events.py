@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+import time
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.outbox import drain, shard_dispatchers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispatch outbox events to the event log.")
+    parser.add_argument("--once", action="store_true", help="drain pending events and exit")
+    parser.add_argument("--log-dir", help="event log directory (default: EVENT_LOG_DIR)")
+    args = parser.parse_args()
+    dispatchers = shard_dispatchers(args.log_dir)
+
+    if args.once:
+        for dispatcher in dispatchers:
+            db = dispatcher.session_factory()
+            try:
+                print(f"Dispatched {drain(db, dispatcher.sink)} events to {dispatcher.sink.root}.")
+            finally:
+                db.close()
+        return
+
+    # Standalone dispatcher for deployments that run the API with OUTBOX_DISPATCHER_ENABLED=false.
+    for dispatcher in dispatchers:
+        dispatcher.start()
+    print(f"Dispatching outbox events to {', '.join(d.sink.root for d in dispatchers)}; Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for dispatcher in dispatchers:
+            dispatcher.stop()
+        print(f"Stopped after dispatching {sum(d.dispatched_total for d in dispatchers)} events.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.price_store import get_price_store
+
+
+def load_prices(paths):
+    store = get_price_store()
+    for path in paths:
+        print(f"Loading {path}...")
+        written = store.load_csv(path)
+        print(f"Appended {sum(written.values())} rows across {len(written)} symbols.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python load_prices.py prices.csv [more.csv ...]")
+        print("CSV columns: symbol,date,close")
+        sys.exit(1)
+    load_prices(sys.argv[1:])
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+from datetime import date
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import get_settings
+from app.database import shard_router
+from app.services.transaction_partitions import archive_before, ensure_partitions, migrate_to_partitioned
+
+
+def months_ago(months):
+    today = date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage transactions partitions and cold history.")
+    parser.add_argument("--shard", action="append", help="shard to process (repeatable; default: all shards)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="Convert transactions to a monthly partitioned table (PostgreSQL)")
+    extend = sub.add_parser("extend", help="Create upcoming monthly partitions")
+    extend.add_argument("--months-ahead", type=int, default=3)
+    archive = sub.add_parser("archive", help="Move old months to the columnar archive")
+    archive.add_argument("--keep-months", type=int, default=get_settings().TRANSACTION_HOT_MONTHS)
+    args = parser.parse_args()
+
+    for shard in args.shard or shard_router.names():
+        engine = shard_router.engine(shard)
+        if args.command == "migrate":
+            print(f"[{shard}] Partitioning transactions table...")
+            copied = migrate_to_partitioned(engine)
+            print(f"[{shard}] Done. {copied} rows copied.")
+        elif args.command == "extend":
+            created = ensure_partitions(engine, args.months_ahead)
+            print(f"[{shard}] Created {len(created)} partitions: {', '.join(m.strftime('%Y-%m') for m in created) or 'none'}")
+        elif args.command == "archive":
+            cutoff = months_ago(args.keep_months)
+            print(f"[{shard}] Archiving transactions before {cutoff.strftime('%Y-%m')}...")
+            months = archive_before(engine, cutoff, shard=shard)
+            print(f"[{shard}] Archived {len(months)} months: {', '.join(m.strftime('%Y-%m') for m in months) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
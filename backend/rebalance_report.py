@@ -0,0 +1,32 @@
+import csv
+import os
+import sys
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import shard_router
+from app.services.rebalancing import drift_all_users
+
+FIELDS = ["user_id", "risk_profile", "total_value", "max_drift", "needs_rebalance"]
+
+
+def rebalance_report(path):
+    scored = flagged = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for shard in shard_router.names():
+            db = shard_router.session(shard)
+            try:
+                for row in drift_all_users(db):
+                    writer.writerow(row)
+                    scored += 1
+                    flagged += row["needs_rebalance"]
+            finally:
+                db.close()
+    print(f"Scored {scored} users, {flagged} need rebalancing. Written to {path}.")
+
+
+if __name__ == "__main__":
+    rebalance_report(sys.argv[1] if len(sys.argv) > 1 else "rebalance_report.csv")
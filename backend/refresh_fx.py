@@ -0,0 +1,26 @@
+import os
+import sys
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import shard_router
+from app.services.fx import FixtureFxProvider, refresh_fx_rates
+from app.services.goal_funding import recompute_goal_funding
+
+
+def refresh_fx(path=None):
+    provider = FixtureFxProvider(path)
+    for shard in shard_router.names():
+        db = shard_router.session(shard)
+        try:
+            snapshot = refresh_fx_rates(db, provider)
+            print(f"[{shard}] Loaded {len(snapshot.rates)} FX rates as of {snapshot.as_of}.")
+            # Goals funded by foreign-currency holdings are valued at the new rates.
+            print(f"[{shard}] Revalued {recompute_goal_funding(db)} goals.")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    refresh_fx(sys.argv[1] if len(sys.argv) > 1 else None)
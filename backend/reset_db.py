@@ -5,22 +5,37 @@ import sys
 # Add backend directory to PYTHONPATH so that 'app' module can be imported
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import engine, Base
-from app.models import User, Goal, Investment, Transaction
+from app.database import engine, Base, DirectoryBase, shard_router
+from app.models import User, Goal, Investment, Transaction, TaxLot, LotDisposal, GoalEarmark, FxRate, OutboxEvent, UserDirectory
 
 from sqlalchemy import text
 
+
+def drop_all(target):
+    if target.dialect.name == "postgresql":
+        with target.connect() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE;"))
+            conn.execute(text("CREATE SCHEMA public;"))
+            conn.commit()
+    else:
+        Base.metadata.drop_all(bind=target)
+        DirectoryBase.metadata.drop_all(bind=target)
+
+
 def reset_db():
+    shard_engines = shard_router.engines()
     print("Dropping all tables...")
-    with engine.connect() as conn:
-        conn.execute(text("DROP SCHEMA public CASCADE;"))
-        conn.execute(text("CREATE SCHEMA public;"))
-        conn.commit()
+    drop_all(engine)
+    for shard_engine in shard_engines.values():
+        if shard_engine is not engine:
+            drop_all(shard_engine)
     print("All tables dropped successfully.")
     
     print("Recreating all tables...")
-    Base.metadata.create_all(bind=engine)
-    print("All tables created successfully.")
+    DirectoryBase.metadata.create_all(bind=engine)
+    for shard_engine in shard_engines.values():
+        Base.metadata.create_all(bind=shard_engine)
+    print(f"All tables created successfully on {len(shard_engines)} shard(s).")
 
 if __name__ == "__main__":
     reset_db()
@@ -0,0 +1,32 @@
+import csv
+import os
+import sys
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import shard_router
+from app.services.risk import score_all_users
+
+FIELDS = ["user_id", "risk_profile", "portfolio_value", "covered_value", "volatility_annual",
+          "var_historical", "var_parametric", "max_drawdown", "drift"]
+
+
+def risk_report(path):
+    report = []
+    for shard in shard_router.names():
+        db = shard_router.session(shard)
+        try:
+            report += score_all_users(db)
+        finally:
+            db.close()
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(report)
+    drifted = sum(1 for row in report if row["drift"] in ("above", "below"))
+    print(f"Scored {len(report)} users, {drifted} outside their risk profile. Written to {path}.")
+
+
+if __name__ == "__main__":
+    risk_report(sys.argv[1] if len(sys.argv) > 1 else "risk_drift_report.csv")
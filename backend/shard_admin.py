@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+
+# Add backend directory to PYTHONPATH so that 'app' module can be imported
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, select
+
+from app.core.config import get_settings
+from app.core.sharding import ShardMap, ShardRouter, format_buckets
+from app.database import Base, engine
+from app.models import User, Goal, Investment, Transaction, TaxLot, LotDisposal, GoalEarmark, FxRate, OutboxEvent  # noqa: F401
+from app.services.shard_rebalance import bucket_counts, move_bucket, plan_rebalance, remove_strays
+
+
+def open_router(path):
+    if not path or not os.path.exists(path):
+        sys.exit(f"Shard map {path or '(unset)'} not found; set SHARD_MAP_PATH or pass --map.")
+    return ShardRouter(engine, path, reload_seconds=0)
+
+
+def init(args):
+    if os.path.exists(args.map) and not args.force:
+        sys.exit(f"{args.map} already exists; pass --force to overwrite it.")
+    shards = dict(spec.split("=", 1) for spec in args.shards)
+    names = list(shards)
+    if args.spread:
+        bucket_shards = [names[b * len(names) // args.buckets] for b in range(args.buckets)]
+    else:
+        # Existing data lives on the first shard; `rebalance` spreads it out.
+        bucket_shards = [names[0]] * args.buckets
+    for name, url in shards.items():
+        shard_engine = create_engine(url)
+        Base.metadata.create_all(bind=shard_engine)
+        with shard_engine.connect() as conn:
+            has_users = conn.execute(select(User.id).limit(1)).first() is not None
+        shard_engine.dispose()
+        if args.spread and has_users:
+            sys.exit(f"Shard {name} already has users; run init without --spread and then rebalance.")
+    ShardMap(shards, bucket_shards).save(args.map)
+    print(f"Wrote {args.map}: {len(shards)} shards, {args.buckets} buckets.")
+
+
+def status(args):
+    router = open_router(args.map)
+    shard_map = router.map
+    counts = bucket_counts(router)
+    for shard in shard_map.shards:
+        buckets = shard_map.buckets_of(shard)
+        users = sum(counts[b] for b in buckets)
+        print(f"{shard}: {users} users in {len(buckets)} buckets [{format_buckets(buckets) or '-'}]")
+    if shard_map.frozen:
+        print(f"Frozen: {format_buckets(shard_map.frozen)}")
+
+
+def add_shard(args):
+    router = open_router(args.map)
+    shard_map = router.map
+    if args.name in shard_map.shards:
+        sys.exit(f"Shard {args.name} already exists.")
+    shard_map.shards[args.name] = args.url
+    shard_map.save(args.map)
+    router.reload()
+    Base.metadata.create_all(bind=router.engine(args.name))
+    print(f"Added shard {args.name} with no buckets; run `rebalance` to move users onto it.")
+
+
+def move(args):
+    router = open_router(args.map)
+    counts = move_bucket(router, args.bucket, args.to, args.settle_seconds)
+    print(f"Copied {', '.join(f'{n} {table}' for table, n in counts.items()) or 'nothing'}.")
+
+
+def rebalance(args):
+    router = open_router(args.map)
+    shard_map = router.map
+    counts = bucket_counts(router)
+    moves = plan_rebalance({shard: {b: counts[b] for b in shard_map.buckets_of(shard)} for shard in shard_map.shards})
+    for bucket, source, target in moves:
+        print(f"Bucket {bucket} ({counts[bucket]} users): {source} -> {target}")
+        if not args.dry_run:
+            move_bucket(router, bucket, target, args.settle_seconds)
+    print(f"{len(moves)} moves {'planned' if args.dry_run else 'done'}.")
+
+
+def cleanup(args):
+    removed = remove_strays(open_router(args.map))
+    print(", ".join(f"{shard}: {n} stray users removed" for shard, n in removed.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the user shard map and move users between shards.")
+    parser.add_argument("--map", default=get_settings().SHARD_MAP_PATH, help="shard map file (default: SHARD_MAP_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("init", help="Write a new shard map and create tables on every shard")
+    p.add_argument("shards", nargs="+", metavar="NAME=URL")
+    p.add_argument("--buckets", type=int, default=64)
+    p.add_argument("--spread", action="store_true", help="spread buckets evenly (shards must be empty)")
+    p.add_argument("--force", action="store_true")
+    p.set_defaults(func=init)
+    sub.add_parser("status", help="Show users and buckets per shard").set_defaults(func=status)
+    p = sub.add_parser("add-shard", help="Add an empty shard")
+    p.add_argument("name")
+    p.add_argument("url")
+    p.set_defaults(func=add_shard)
+    p = sub.add_parser("move", help="Move one bucket of users to another shard")
+    p.add_argument("--bucket", type=int, required=True)
+    p.add_argument("--to", required=True)
+    p.add_argument("--settle-seconds", type=float)
+    p.set_defaults(func=move)
+    p = sub.add_parser("rebalance", help="Move buckets until users are spread evenly")
+    p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--settle-seconds", type=float)
+    p.set_defaults(func=rebalance)
+    sub.add_parser("cleanup", help="Delete copies left behind by an interrupted move").set_defaults(func=cleanup)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
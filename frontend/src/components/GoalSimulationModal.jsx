@@ -1,11 +1,11 @@
 import React, { useState, useEffect } from 'react';
 import { X, TrendingUp, Download, CheckCircle, AlertTriangle } from 'lucide-react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, ReferenceLine } from 'recharts';
-import { exportElementToPDF } from '../utils/exportUtils';
+import { downloadReport } from '../utils/exportUtils';
 
 const GoalSimulationModal = ({ goal, onClose }) => {
     const [targetAmount, setTargetAmount] = useState(parseFloat(goal.target_amount));
-    const [currentAmount] = useState(0); // Assuming 0 as we don't track saved locally per goal yet
+    const [currentAmount] = useState(parseFloat(goal.funded_amount || 0)); // Earmarked holdings already funding the goal
     const [monthlyContribution, setMonthlyContribution] = useState(parseFloat(goal.monthly_contribution));
     const [annualReturn, setAnnualReturn] = useState(7.0);
     const [inflationRate] = useState(2.5);
@@ -15,6 +15,7 @@ const GoalSimulationModal = ({ goal, onClose }) => {
     const [achievable, setAchievable] = useState(false);
     const [finalValue, setFinalValue] = useState(0);
     const [estimatedCompletion, setEstimatedCompletion] = useState(null);
+    const [exportError, setExportError] = useState('');
 
     useEffect(() => {
         // Calculate difference between Target Date and Now
@@ -68,12 +69,28 @@ const GoalSimulationModal = ({ goal, onClose }) => {
         }
     };
 
-    const exportSimulation = () => {
-        exportElementToPDF('simulation-report', `${goal.goal_type}-simulation.pdf`);
+    const exportSimulation = async () => {
+        try {
+            await downloadReport(`/api/reports/goals/${goal.id}/simulation`, {
+                target_amount: targetAmount,
+                monthly_contribution: monthlyContribution,
+                annual_return: annualReturn,
+                years: timeHorizon,
+            }, `${goal.goal_type}-simulation.pdf`);
+        } catch {
+            setExportError('Export failed. Please try again.');
+            setTimeout(() => setExportError(''), 4000);
+        }
     };
 
     return (
         <div className="fixed inset-0 bg-slate-950/90 backdrop-blur-md flex items-center justify-center p-4 z-50 overflow-y-auto">
+            {exportError && (
+                <div className="fixed bottom-6 right-6 bg-rose-500/10 border border-rose-500/20 text-rose-400 px-6 py-4 rounded-2xl shadow-2xl flex items-center gap-3 z-50 animate-in slide-in-from-bottom flex-row">
+                    <AlertTriangle size={20} className="text-rose-500" />
+                    <span className="font-bold">{exportError}</span>
+                </div>
+            )}
             <div className="bg-slate-900 border border-slate-700/50 rounded-2xl w-full max-w-5xl shadow-2xl relative my-8" id="simulation-report">
 
                 <div className="p-6 border-b border-slate-800 flex justify-between items-center bg-slate-800/50 rounded-t-2xl">
@@ -87,10 +104,10 @@ const GoalSimulationModal = ({ goal, onClose }) => {
                         </div>
                     </div>
                     <div className="flex items-center gap-3">
-                        <button onClick={exportSimulation} className="fintech-btn-secondary py-2 flex items-center gap-2" data-html2canvas-ignore>
+                        <button onClick={exportSimulation} className="fintech-btn-secondary py-2 flex items-center gap-2">
                             <Download size={16} /> Export PDF
                         </button>
-                        <button onClick={onClose} className="text-slate-400 hover:text-slate-200" data-html2canvas-ignore>
+                        <button onClick={onClose} className="text-slate-400 hover:text-slate-200">
                             <X size={24} />
                         </button>
                     </div>
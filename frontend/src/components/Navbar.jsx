@@ -1,17 +1,23 @@
-import React from 'react';
+import React, { useState } from 'react';
 import { useLocation, Link } from 'react-router-dom';
-import { Search, Download, ChevronDown } from 'lucide-react';
+import { Search, Download, ChevronDown, AlertTriangle } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
-import { exportElementToPDF } from '../utils/exportUtils';
+import { downloadCurrentStatement } from '../utils/exportUtils';
 
 const Navbar = () => {
     const location = useLocation();
     const pathName = location.pathname.split('/').pop();
     const title = pathName ? pathName.charAt(0).toUpperCase() + pathName.slice(1) : 'Overview';
     const { user } = useAuth();
+    const [exportError, setExportError] = useState('');
 
-    const handleExport = () => {
-        exportElementToPDF(`${pathName}-view`, `${pathName}-report.pdf`);
+    const handleExport = async () => {
+        try {
+            await downloadCurrentStatement();
+        } catch {
+            setExportError('Export failed. Please try again.');
+            setTimeout(() => setExportError(''), 4000);
+        }
     };
 
     return (
@@ -33,10 +39,18 @@ const Navbar = () => {
                 </div>
 
                 {/* Global Export Button */}
-                <button onClick={handleExport} className="flex items-center gap-2 px-3 py-2 bg-[#1e293b] border border-slate-700/50 rounded-lg text-slate-300 hover:text-white hover:bg-emerald-600 hover:border-emerald-500 transition-all text-sm font-semibold shadow-sm" data-html2canvas-ignore>
+                <button onClick={handleExport} className="flex items-center gap-2 px-3 py-2 bg-[#1e293b] border border-slate-700/50 rounded-lg text-slate-300 hover:text-white hover:bg-emerald-600 hover:border-emerald-500 transition-all text-sm font-semibold shadow-sm">
                     <Download size={16} /> Export PDF
                 </button>
 
+                {/* Export Error Toast */}
+                {exportError && (
+                    <div className="fixed bottom-6 right-6 bg-rose-500/10 border border-rose-500/20 text-rose-400 px-6 py-4 rounded-2xl shadow-2xl flex items-center gap-3 z-50 animate-in slide-in-from-bottom flex-row">
+                        <AlertTriangle size={20} className="text-rose-500" />
+                        <span className="font-bold">{exportError}</span>
+                    </div>
+                )}
+
                 {/* Profile Element Map */}
                 <div className="flex items-center gap-3 pl-5 border-l border-[#1e293b] cursor-pointer group">
                     <div className="w-8 h-8 rounded-full bg-indigo-500 flex items-center justify-center text-white font-bold text-sm shadow-md shadow-indigo-500/20">
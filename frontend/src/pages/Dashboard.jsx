@@ -17,14 +17,12 @@ const Dashboard = () => {
 
     const fetchDashboard = async () => {
         try {
-            const [sumRes, txRes, allocRes] = await Promise.all([
-                api.get('/api/dashboard/summary'),
-                api.get('/api/transactions'),
-                api.get('/api/portfolio/allocation')
-            ]);
-            setData(sumRes.data);
-            setRecentTx(txRes.data.slice(0, 5));
-            setAllocationData(allocRes.data);
+            const { data: page } = await api.get('/api/bootstrap', {
+                params: { resources: 'dashboard_summary,transactions,allocation', transaction_limit: 5 }
+            });
+            setData(page.dashboard_summary);
+            setRecentTx(page.transactions);
+            setAllocationData(page.allocation);
         } catch (error) {
             console.error('Error fetching dashboard', error);
         } finally {
@@ -256,7 +254,7 @@ const Dashboard = () => {
                     <div className="flex-1 space-y-6 overflow-y-auto max-h-[350px] pr-2 custom-scrollbar">
                         {goal_progress_summary.length > 0 ? (
                             goal_progress_summary.map((goal) => {
-                                const limit = Math.min(100, Math.max(2, (0 / parseFloat(goal.target_amount)) * 100)); // Default mock % since saved=0 locally
+                                const limit = Math.min(100, Math.max(2, goal.progress_percentage || 0));
                                 const isComplete = goal.status === 'completed';
                                 return (
                                     <div key={goal.id} className="relative p-4 rounded-xl bg-[#0f172a]/50 hover:bg-[#0f172a] transition-colors border border-transparent hover:border-slate-700/50">
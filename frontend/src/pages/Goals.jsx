@@ -140,8 +140,7 @@ const Goals = () => {
             ) : (
                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
                     {filteredGoals.map((goal) => {
-                        const currentSaved = 0; // Backend placeholder for accumulated savings per goal wasn't strictly built yet
-                        const progress = Math.min(100, (currentSaved / parseFloat(goal.target_amount)) * 100);
+                        const progress = goal.progress_percentage || 0;
                         return (
                             <div key={goal.id} className="fintech-card p-6 relative overflow-hidden group">
                                 <div className={`absolute top-0 right-0 w-1.5 h-full transition-colors ${goal.status === 'active' ? 'bg-emerald-500' : goal.status === 'completed' ? 'bg-blue-500' : 'bg-amber-500'}`}></div>
@@ -1,8 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { PieChart, Pie, Cell, Tooltip, ResponsiveContainer, Legend } from 'recharts';
 import api from '../services/api';
-import { TrendingUp, TrendingDown, Wallet, DollarSign, Briefcase, Download, PieChart as PieChartIcon } from 'lucide-react';
-import { exportElementToPDF } from '../utils/exportUtils';
+import { TrendingUp, TrendingDown, Wallet, DollarSign, Briefcase, Download, AlertTriangle, PieChart as PieChartIcon } from 'lucide-react';
+import { downloadCurrentStatement } from '../utils/exportUtils';
 
 const COLORS = ['#10b981', '#3b82f6', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4'];
 
@@ -10,6 +10,7 @@ const Portfolio = () => {
     const [summary, setSummary] = useState(null);
     const [allocationData, setAllocationData] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [exportError, setExportError] = useState('');
 
     useEffect(() => {
         fetchData();
@@ -31,8 +32,13 @@ const Portfolio = () => {
         }
     };
 
-    const handleExport = () => {
-        exportElementToPDF('portfolio-view', 'portfolio-report.pdf');
+    const handleExport = async () => {
+        try {
+            await downloadCurrentStatement();
+        } catch {
+            setExportError('Export failed. Please try again.');
+            setTimeout(() => setExportError(''), 4000);
+        }
     };
 
     if (loading) return (
@@ -62,6 +68,14 @@ const Portfolio = () => {
     return (
         <div className="flex flex-col gap-6 animate-in fade-in duration-500 pb-12" id="portfolio-view">
 
+            {/* --- EXPORT ERROR TOAST --- */}
+            {exportError && (
+                <div className="fixed bottom-6 right-6 bg-rose-500/10 border border-rose-500/20 text-rose-400 px-6 py-4 rounded-2xl shadow-2xl flex items-center gap-3 z-50 animate-in slide-in-from-bottom flex-row">
+                    <AlertTriangle size={20} className="text-rose-500" />
+                    <span className="font-bold">{exportError}</span>
+                </div>
+            )}
+
             {/* --- PAGE HEADER --- */}
             <div className="fintech-card p-6 border-l-4 border-l-purple-500 flex flex-col md:flex-row justify-between items-start md:items-center gap-4 bg-gradient-to-r from-slate-800 to-slate-900 shadow-xl">
                 <div className="flex items-center gap-4">
@@ -73,7 +87,7 @@ const Portfolio = () => {
                         <p className="text-slate-400 font-medium tracking-wide">High-level overview of your wealth allocations and performance.</p>
                     </div>
                 </div>
-                <button onClick={handleExport} className="fintech-btn-secondary flex items-center gap-2" data-html2canvas-ignore>
+                <button onClick={handleExport} className="fintech-btn-secondary flex items-center gap-2">
                     <Download size={18} /> Export PDF
                 </button>
             </div>
@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
 import { DownloadCloud, Loader2, CheckCircle, Calendar, FileText, Download, Trash2, ArrowRight, FileCheck, Layers } from 'lucide-react';
+import { downloadReport } from '../utils/exportUtils';
 
 const Reports = () => {
     const [isGenerating, setIsGenerating] = useState(false);
@@ -7,34 +8,42 @@ const Reports = () => {
     const [history, setHistory] = useState([]);
 
     const [builderForm, setBuilderForm] = useState({
-        type: 'Dashboard Summary',
-        startDate: '',
-        endDate: '',
+        type: 'Monthly Statement',
+        month: new Date().toISOString().slice(0, 7),
+        year: String(new Date().getFullYear()),
         format: 'PDF',
     });
 
-    const handleGenerate = (e) => {
+    const fetchReport = (report) => downloadReport(
+        '/api/reports/statement',
+        { period: report.period, format: report.format.toLowerCase() },
+        `${report.name}.${report.format.toLowerCase()}`
+    );
+
+    const handleGenerate = async (e) => {
         e.preventDefault();
         setIsGenerating(true);
 
-        // Simulate backend report generation
-        setTimeout(() => {
-            const newReport = {
-                id: Date.now(),
-                name: `${builderForm.type.replace(' ', '_')}_Report`,
-                type: builderForm.type,
-                dateRange: builderForm.startDate && builderForm.endDate ? `${builderForm.startDate} to ${builderForm.endDate}` : 'All Time',
-                format: builderForm.format,
-                generatedAt: new Date().toISOString(),
-            };
+        const period = builderForm.type === 'Monthly Statement' ? builderForm.month : builderForm.year;
+        const newReport = {
+            id: Date.now(),
+            name: `statement-${period}`,
+            type: builderForm.type,
+            period,
+            format: builderForm.format,
+            generatedAt: new Date().toISOString(),
+        };
 
+        try {
+            await fetchReport(newReport);
             setHistory([newReport, ...history]);
-            setIsGenerating(false);
             setToastMsg('Report generated and downloaded successfully!');
+        } catch {
+            setToastMsg('Report generation failed. Please try again.');
+        } finally {
+            setIsGenerating(false);
             setTimeout(() => setToastMsg(''), 4000);
-
-            // In a real app, window.location.href = download_url or Blob download
-        }, 1500);
+        }
     };
 
     const handleDelete = (id) => {
@@ -86,38 +95,35 @@ const Reports = () => {
                             value={builderForm.type}
                             onChange={(e) => setBuilderForm({ ...builderForm, type: e.target.value })}
                         >
-                            <option value="Dashboard Summary">Dashboard Summary</option>
-                            <option value="Portfolio Allocation">Portfolio Allocation</option>
-                            <option value="Goals Overview">Goals Overview</option>
-                            <option value="Transactions Log">Transactions Log</option>
-                            <option value="Investment Performance">Investment Performance</option>
+                            <option value="Monthly Statement">Monthly Statement</option>
+                            <option value="Annual Statement">Annual Statement</option>
                         </select>
                     </div>
 
-                    {/* Date Range Start */}
-                    <div>
-                        <label className="flex items-center gap-1.5 text-sm font-bold text-slate-400 uppercase tracking-widest mb-2">
-                            <Calendar size={14} /> Start Date
-                        </label>
-                        <input
-                            type="date"
-                            className="fintech-input font-bold !bg-slate-900/80 [&::-webkit-calendar-picker-indicator]:filter [&::-webkit-calendar-picker-indicator]:invert"
-                            value={builderForm.startDate}
-                            onChange={(e) => setBuilderForm({ ...builderForm, startDate: e.target.value })}
-                        />
-                    </div>
-
-                    {/* Date Range End */}
+                    {/* Statement Period */}
                     <div>
                         <label className="flex items-center gap-1.5 text-sm font-bold text-slate-400 uppercase tracking-widest mb-2">
-                            <Calendar size={14} /> End Date
+                            <Calendar size={14} /> Period
                         </label>
-                        <input
-                            type="date"
-                            className="fintech-input font-bold !bg-slate-900/80 [&::-webkit-calendar-picker-indicator]:filter [&::-webkit-calendar-picker-indicator]:invert"
-                            value={builderForm.endDate}
-                            onChange={(e) => setBuilderForm({ ...builderForm, endDate: e.target.value })}
-                        />
+                        {builderForm.type === 'Monthly Statement' ? (
+                            <input
+                                type="month"
+                                required
+                                className="fintech-input font-bold !bg-slate-900/80 [&::-webkit-calendar-picker-indicator]:filter [&::-webkit-calendar-picker-indicator]:invert"
+                                value={builderForm.month}
+                                onChange={(e) => setBuilderForm({ ...builderForm, month: e.target.value })}
+                            />
+                        ) : (
+                            <input
+                                type="number"
+                                required
+                                min="1970"
+                                max="2100"
+                                className="fintech-input font-bold !bg-slate-900/80"
+                                value={builderForm.year}
+                                onChange={(e) => setBuilderForm({ ...builderForm, year: e.target.value })}
+                            />
+                        )}
                     </div>
 
                     {/* Format */}
@@ -174,7 +180,7 @@ const Reports = () => {
                             <tr className="bg-slate-900/80 border-b border-slate-700/80">
                                 <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider">Report Name</th>
                                 <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider">Type / Content</th>
-                                <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider">Date Filters</th>
+                                <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider">Period</th>
                                 <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider">Format</th>
                                 <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider">Generated At</th>
                                 <th className="p-4 font-bold text-slate-400 text-xs uppercase tracking-wider text-right">Actions</th>
@@ -200,7 +206,7 @@ const Reports = () => {
                                             </div>
                                         </td>
                                         <td className="p-4 font-medium text-slate-300">{report.type}</td>
-                                        <td className="p-4 font-medium text-slate-400 text-sm whitespace-nowrap">{report.dateRange}</td>
+                                        <td className="p-4 font-medium text-slate-400 text-sm whitespace-nowrap">{report.period}</td>
                                         <td className="p-4">
                                             <span className={`px-2 py-1 rounded-md text-xs font-bold border tracking-wide uppercase ${report.format === 'PDF' ? 'bg-rose-500/10 text-rose-400 border-rose-500/20' : 'bg-emerald-500/10 text-emerald-400 border-emerald-500/20'}`}>
                                                 {report.format}
@@ -213,7 +219,7 @@ const Reports = () => {
                                         </td>
                                         <td className="p-4 text-right">
                                             <div className="flex justify-end gap-2 opacity-50 group-hover:opacity-100 transition-opacity">
-                                                <button className="p-2 text-blue-400 bg-blue-500/10 rounded-lg hover:bg-blue-500/20 transition-all border border-blue-500/20 shadow hover:shadow-lg hover:-translate-y-0.5" title="Download Again">
+                                                <button onClick={() => fetchReport(report).catch(() => {})} className="p-2 text-blue-400 bg-blue-500/10 rounded-lg hover:bg-blue-500/20 transition-all border border-blue-500/20 shadow hover:shadow-lg hover:-translate-y-0.5" title="Download Again">
                                                     <Download size={14} />
                                                 </button>
                                                 <button onClick={() => handleDelete(report.id)} className="p-2 text-slate-400 bg-slate-700/50 rounded-lg hover:text-rose-400 hover:bg-rose-500/10 hover:border-rose-500/30 transition-all border border-transparent shadow hover:-translate-y-0.5" title="Delete Log">
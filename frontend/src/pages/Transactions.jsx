@@ -9,6 +9,9 @@ const Transactions = () => {
     const [loading, setLoading] = useState(true);
     const [isModalOpen, setModalOpen] = useState(false);
     const [editingTransaction, setEditingTransaction] = useState(null);
+    // Recent months come from the default listing; archived history is read a year at a time before this date.
+    const [olderBefore, setOlderBefore] = useState(null);
+    const [loadingOlder, setLoadingOlder] = useState(false);
 
     const [formData, setFormData] = useState({
         symbol: '',
@@ -23,6 +26,7 @@ const Transactions = () => {
             setLoading(true);
             const { data } = await api.get('/api/transactions');
             setTransactions(data);
+            setOlderBefore(data.length ? data[data.length - 1].executed_at : new Date().toISOString());
         } catch (error) {
             console.error('Failed to fetch transactions', error);
         } finally {
@@ -30,6 +34,23 @@ const Transactions = () => {
         }
     };
 
+    const loadOlder = async () => {
+        const start = new Date(olderBefore);
+        start.setFullYear(start.getFullYear() - 1);
+        try {
+            setLoadingOlder(true);
+            const { data } = await api.get('/api/transactions', {
+                params: { start: start.toISOString().slice(0, 19), end: olderBefore.slice(0, 19) }
+            });
+            setTransactions(prev => [...prev, ...data]);
+            setOlderBefore(start.toISOString());
+        } catch (error) {
+            console.error('Failed to fetch older transactions', error);
+        } finally {
+            setLoadingOlder(false);
+        }
+    };
+
     useEffect(() => {
         fetchTransactions();
     }, []);
@@ -222,6 +243,13 @@ const Transactions = () => {
                         </tbody>
                     </table>
                 </div>
+                {!loading && olderBefore && (
+                    <div className="p-4 border-t border-slate-700/50 flex justify-center bg-slate-900/40">
+                        <button onClick={loadOlder} disabled={loadingOlder} className="fintech-btn-secondary !py-2 text-sm">
+                            {loadingOlder ? 'Loading...' : `Load history before ${new Date(olderBefore).toLocaleDateString()}`}
+                        </button>
+                    </div>
+                )}
             </div>
 
             {isModalOpen && (
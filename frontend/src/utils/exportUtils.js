@@ -1,5 +1,4 @@
-import jsPDF from 'jspdf';
-import html2canvas from 'html2canvas';
+import api from '../services/api';
 
 // Helper to download table data as CSV
 export const downloadCSV = (headers, rows, filename = 'export.csv') => {
@@ -18,21 +17,26 @@ export const downloadCSV = (headers, rows, filename = 'export.csv') => {
     document.body.removeChild(link);
 };
 
-// Helper to export specific HTML element (dashboard/chart views) to PDF
-export const exportElementToPDF = async (elementId, filename = 'report.pdf') => {
-    const element = document.getElementById(elementId);
-    if (!element) return;
-
+// Helper to download a report rendered by the backend (vector PDF or CSV)
+export const downloadReport = async (path, params = {}, filename = 'report.pdf') => {
     try {
-        const canvas = await html2canvas(element, { scale: 2, backgroundColor: '#0f172a' });
-        const imgData = canvas.toDataURL('image/jpeg', 0.98);
-        const pdf = new jsPDF('p', 'mm', 'a4');
-        const pdfWidth = pdf.internal.pageSize.getWidth();
-        const pdfHeight = (canvas.height * pdfWidth) / canvas.width;
-
-        pdf.addImage(imgData, 'JPEG', 0, 0, pdfWidth, pdfHeight);
-        pdf.save(filename);
+        const response = await api.get(path, { params, responseType: 'blob' });
+        const url = URL.createObjectURL(response.data);
+        const link = document.createElement('a');
+        link.setAttribute('href', url);
+        link.setAttribute('download', filename);
+        document.body.appendChild(link);
+        link.click();
+        document.body.removeChild(link);
+        URL.revokeObjectURL(url);
     } catch (error) {
-        console.error('Error exporting PDF', error);
+        console.error('Error downloading report', error);
+        throw error;
     }
 };
+
+// Monthly statement for the current month as PDF
+export const downloadCurrentStatement = () => {
+    const period = new Date().toISOString().slice(0, 7);
+    return downloadReport('/api/reports/statement', { period, format: 'pdf' }, `statement-${period}.pdf`);
+};